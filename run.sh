@@ -25,11 +25,56 @@ add_arg mqtt_username
 add_arg mqtt_password
 add_arg mqtt_proto
 add_arg mqtt_transport
+add_arg mqtt_publish_max_age
+add_arg mqtt_subscribe_mode
+add_arg mqtt_state_qos
+add_arg mqtt_inflight
+add_arg mqtt_state_snapshot_max_age
 add_arg lt_host
 add_arg lt_port
 add_arg lt_key
+add_arg lt_command_window
+add_arg lt_command_rate
+add_arg lt_command_burst
+add_arg lt_sync_interval
+add_arg lt_ping_interval
+add_arg lt_ping_timeout
 add_arg lt_ignore_addr
 add_arg lt_ignore_type
 add_arg lt_ignore_area
 
+if bashio::config.true "lt_command_batch"; then
+    ARGS+=(--lt-command-batch)
+fi
+
+for HUB in $(bashio::config "lt_hubs|keys"); do
+    ARGS+=(
+        --lt-hub
+        "$(bashio::config "lt_hubs[${HUB}].prefix")"
+        "$(bashio::config "lt_hubs[${HUB}].host")"
+        "$(bashio::config "lt_hubs[${HUB}].port")"
+        "$(bashio::config "lt_hubs[${HUB}].key")"
+    )
+done
+
+for PRIORITY in $(bashio::config "lt_command_priorities|keys"); do
+    ARGS+=(
+        --lt-command-priority
+        "$(bashio::config "lt_command_priorities[${PRIORITY}].addr")"
+        "$(bashio::config "lt_command_priorities[${PRIORITY}].priority")"
+    )
+done
+
+for FILTER in $(bashio::config "lt_state_filters|keys"); do
+    ARGS+=(
+        --lt-state-filter
+        "$(bashio::config "lt_state_filters[${FILTER}].target")"
+        "$(bashio::config "lt_state_filters[${FILTER}].filter")"
+    )
+done
+
+# The add-on's persistent storage.
+ARGS+=(--mqtt-discovery-cache /data/discovery.json)
+ARGS+=(--mqtt-state-snapshot /data/states.json)
+
 exec "${ARGS[@]}"
@@ -0,0 +1,168 @@
+import asyncio
+from time import monotonic
+from typing import Callable, Iterable
+
+
+class LarnitechCommandQueue:
+    """
+    The pipeline in front of the Larnitech `status-set` request.
+
+    Commands arriving within the `window` are coalesced per `addr` (later
+    values override earlier ones) and, with `batch`, batched: adjacent
+    commands with identical statuses become a single request for several
+    `addr`.
+
+    The requests are sent at most `rate` per second, with bursts of up to
+    `burst` (a token bucket), and the commands of the highest `priority` go
+    first; those waiting for their turn keep being coalesced.
+
+    The commands are held here while Larnitech is unreachable (see `hold()`),
+    then at most `limit` devices keep theirs, the oldest are dropped above
+    that. While it's connected, the pending commands are bounded by the
+    number of devices only, as a scene may command all of them at once.
+    """
+
+    def __init__(
+        self,
+        window: float,
+        limit: int,
+        rate: float = 0,
+        burst: int = 1,
+        priority: Callable[[str], int] = lambda addr: 0,
+        batch: bool = False,
+    ) -> None:
+        self._window = window
+        self._batch = batch
+        self._limit = limit
+        self._rate = rate
+        self._burst = burst
+        self._priority = priority
+        self._pending: dict[str, dict] = {}
+        self._ready = asyncio.Event()
+        self._tokens = float(burst)
+        self._updated = monotonic()
+        self._held = True
+
+    def put(self, commands: Iterable[tuple[str, dict]]) -> tuple[str, ...]:
+        """
+        Queue the commands.
+
+        :return: The `addr` of the dropped commands.
+        """
+        for addr, status in commands:
+            # Re-insert so the position reflects the latest command. It
+            # keeps the order in which a device emitted its commands (see
+            # `LarnitechAirFanMultispeed.notify_lt()`) when it's coalesced.
+            previous = self._pending.pop(addr, None)
+            self._pending[addr] = {**previous, **status} if previous else status
+
+        self._ready.set()
+
+        return self._trim()
+
+    def requeue(self, commands: Iterable[tuple[str, dict]]) -> tuple[str, ...]:
+        """
+        Put back the commands that failed to be sent. They precede the ones
+        queued since, which override them.
+
+        :return: The `addr` of the dropped commands.
+        """
+        pending = {}
+
+        for addr, status in commands:
+            newer = self._pending.pop(addr, None)
+            pending[addr] = {**status, **newer} if newer else status
+
+        pending.update(self._pending)
+        self._pending = pending
+        self._ready.set()
+
+        return self._trim()
+
+    def hold(self) -> tuple[str, ...]:
+        """
+        Hold the commands till `release()`, as Larnitech is unreachable.
+
+        :return: The `addr` of the dropped commands.
+        """
+        self._held = True
+
+        return self._trim()
+
+    def release(self) -> None:
+        self._held = False
+
+    def _trim(self) -> tuple[str, ...]:
+        if not self._held:
+            return ()
+
+        dropped = []
+
+        while len(self._pending) > self._limit:
+            addr = next(iter(self._pending))
+            del self._pending[addr]
+            dropped.append(addr)
+
+        return tuple(dropped)
+
+    async def get(self) -> tuple[tuple[str, ...], dict]:
+        """
+        Wait for the commands and return the next `(addrs, status)` batch.
+        """
+        while not self._pending:
+            self._ready.clear()
+            await self._ready.wait()
+
+            if self._window > 0:
+                await asyncio.sleep(self._window)
+
+        await self._take_token()
+
+        # The commands that came while waiting for the token compete too.
+        top = max(map(self._priority, self._pending))
+        addrs: list[str] = []
+        status: dict | None = None
+
+        # Only adjacent commands are merged since reordering
+        # them may break the sequence a device relies on.
+        for addr, _status in self._pending.items():
+            if self._priority(addr) != top:
+                continue
+
+            if status is None:
+                status = _status
+            elif _status != status:
+                break
+
+            addrs.append(addr)
+
+            if not self._batch:
+                break
+
+        for addr in addrs:
+            del self._pending[addr]
+
+        return tuple(addrs), status
+
+    async def _take_token(self) -> None:
+        if self._rate <= 0:
+            return
+
+        while True:
+            now = monotonic()
+            self._tokens = min(self._burst, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+
+            await asyncio.sleep((1 - self._tokens) / self._rate)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+__all__ = [
+    "LarnitechCommandQueue",
+]
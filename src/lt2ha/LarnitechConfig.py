@@ -1,6 +1,8 @@
 from dataclasses import dataclass
 from websockets import connect
 
+from .LarnitechStateFilter import LarnitechStateFilter
+
 
 @dataclass(frozen=True)
 class LarnitechConfig:
@@ -40,6 +42,66 @@ class LarnitechConfig:
     to HA (case-insensitive).
     """
 
+    command_window: float = 0.02
+    """
+    The time (in seconds) to collect the commands from HA for before sending
+    them to Larnitech. Several commands for the same device within the window
+    are merged, and the same command for several devices is sent at once if
+    `command_batch` is on.
+    """
+
+    command_batch: bool = False
+    """
+    Whether to send the same command for several devices as one `status-set`
+    request with the list of their `addr`. The form is not documented for
+    the API2, so it's off unless the hub is known to accept it.
+    """
+
+    command_rate: float = 0
+    """
+    The number of `status-set` requests per second to send to Larnitech at
+    most, not to flood it with the bursts of commands. Zero means unlimited.
+    """
+
+    command_burst: int = 10
+    """
+    The number of requests that may be sent at once, above the `command_rate`,
+    after a quiet period.
+    """
+
+    command_priorities: tuple[tuple[str, int], ...] = ()
+    """
+    The priorities of the commands for specific devices (use `addr` to
+    identify the device in Larnitech), overriding those of their classes. The
+    commands of a higher priority are sent first.
+    """
+
+    state_filters: tuple[tuple[str, LarnitechStateFilter], ...] = ()
+    """
+    The filters of the numeric states sent to HA for specific devices (use
+    `addr` or the type to identify them in Larnitech), overriding those of
+    their classes. The filter applies to the values the class filters, or to
+    the main state if it filters none.
+    """
+
+    sync_interval: float = 300
+    """
+    The time (in seconds) between checks for the devices added, changed or
+    removed in Larnitech, to reflect them in HA. Zero means never.
+    """
+
+    ping_interval: float = 10
+    """
+    The time (in seconds) between the pings to Larnitech, to measure the
+    round trip and to notice a dead connection. Zero means never.
+    """
+
+    ping_timeout: float = 5
+    """
+    The time (in seconds) to wait for the reply to a ping before considering
+    the connection dead and reconnecting.
+    """
+
     def __post_init__(self) -> None:
         object.__setattr__(
             self,
@@ -52,6 +114,7 @@ class LarnitechConfig:
             f"ws://{self.host}:{self.port}/api",
             max_size=10 * 1024 * 1024,
             close_timeout=10,
+            # The bridge pings on its own, to measure the round trip.
             ping_interval=None,
             ping_timeout=None,
         )
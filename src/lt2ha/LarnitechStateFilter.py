@@ -0,0 +1,66 @@
+from dataclasses import dataclass, fields
+
+
+@dataclass(frozen=True)
+class LarnitechStateFilter:
+    """
+    How a numeric state from Larnitech is thinned out on its way to HA. All
+    zeros pass every change through as is.
+    """
+
+    deadband: float = 0
+    """
+    The change from the last published value to publish a new one.
+    """
+
+    deadband_relative: float = 0
+    """
+    The same as the `deadband`, as the fraction of the last published value
+    (i.e. `0.05` for 5%). The larger of the two applies.
+    """
+
+    min_interval: float = 0
+    """
+    The time (in seconds) to publish the value not more often than. The
+    change within the interval is published at its end.
+    """
+
+    max_interval: float = 0
+    """
+    The time (in seconds) to publish the latest value at least once in, even
+    if unchanged or within the deadband. Zero means never.
+    """
+
+    window: float = 0
+    """
+    The time (in seconds) to publish the average of the values within,
+    instead of the latest one. Zero means no averaging.
+    """
+
+    @classmethod
+    def parse(cls, spec: str) -> "LarnitechStateFilter":
+        """
+        Make the filter of the `name=value` pairs, separated by commas, i.e.
+        `deadband=0.5,min_interval=60`.
+        """
+        names = {field.name for field in fields(cls)}
+        values = {}
+
+        for pair in filter(None, spec.split(",")):
+            name, _, value = pair.partition("=")
+            name = name.strip()
+
+            if name not in names:
+                raise ValueError(f"Unknown {name!r}, expected one of: {', '.join(sorted(names))}")
+
+            values[name] = float(value)
+
+            if values[name] < 0:
+                raise ValueError(f"The {name!r} must not be negative")
+
+        return cls(**values)
+
+
+__all__ = [
+    "LarnitechStateFilter",
+]
@@ -0,0 +1,101 @@
+import asyncio
+import gzip
+from json import dumps as json_dumps, loads as json_loads
+from time import monotonic
+from typing import Any, Iterator
+
+
+class TrafficRecorder:
+    """
+    Captures the traffic between the bridge, Larnitech and HA for an offline
+    replay (see `lt2ha.bench.replay`).
+
+    The capture is an append-only gzip stream of JSON lines, each being
+    `[time, channel, data]` where the `time` is in seconds since the start of
+    the recording. Every start of the bridge appends a new segment beginning
+    with the `start` channel. The stream is flushed a second after the first
+    unflushed record, so a crash loses at most that.
+    """
+
+    LT_IN = "lt<"
+    """
+    A frame received from Larnitech; the `data` is the frame.
+    """
+
+    LT_OUT = "lt>"
+    """
+    A frame sent to Larnitech; the `data` is the frame.
+    """
+
+    MQTT_IN = "mqtt<"
+    """
+    A message received from HA; the `data` is `[topic, payload]`.
+    """
+
+    START = "start"
+
+    _FLUSH_INTERVAL = 1
+
+    def __init__(self, path: str) -> None:
+        self._file = gzip.open(path, "at", encoding="utf-8")
+        self._started = monotonic()
+        self._flush: asyncio.TimerHandle | None = None
+        # Before the loop runs, so it's flushed along with the next record.
+        self._write(self.START, None)
+
+    def record(self, channel: str, data: Any) -> None:
+        self._write(channel, data)
+
+        if self._flush is None:
+            # Batch the writes, this is called for every frame.
+            self._flush = asyncio.get_running_loop().call_later(self._FLUSH_INTERVAL, self._flush_file)
+
+    def close(self) -> None:
+        if self._flush:
+            self._flush.cancel()
+            self._flush = None
+
+        self._file.close()
+
+    def _write(self, channel: str, data: Any) -> None:
+        if isinstance(data, tuple):
+            data = tuple(map(_to_text, data))
+        else:
+            data = _to_text(data)
+
+        line = json_dumps((round(monotonic() - self._started, 6), channel, data))
+
+        self._file.write(line)
+        self._file.write("\n")
+
+    def _flush_file(self) -> None:
+        self._flush = None
+
+        if not self._file.closed:
+            self._file.flush()
+
+    @classmethod
+    def read(cls, path: str) -> Iterator[tuple[float, str, Any]]:
+        """
+        Read the records, tolerating the truncated end of a crashed recording.
+        """
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            try:
+                for line in file:
+                    if line.endswith("\n"):
+                        yield tuple(json_loads(line))
+            except (EOFError, gzip.BadGzipFile):
+                pass
+
+
+def _to_text(data: Any) -> Any:
+    if isinstance(data, bytes):
+        # Keep malformed UTF-8 as is, it's a part of the traffic too.
+        return data.decode("utf-8", errors="surrogateescape")
+
+    return data
+
+
+__all__ = [
+    "TrafficRecorder",
+]
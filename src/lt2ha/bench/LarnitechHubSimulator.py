@@ -0,0 +1,114 @@
+import asyncio
+
+from websockets.asyncio.server import Server, ServerConnection, serve
+
+from ..codec import json_dumps, json_loads
+
+
+class LarnitechHubSimulator:
+    """
+    A local stand-in for the Larnitech hub speaking the subset of API2 the
+    bridge uses: `authorize`, `get-devices`, `status-subscribe`, `status-set`
+    and the `statuses` events.
+    """
+
+    def __init__(self, devices: list[dict], key: str = "") -> None:
+        self.devices = {item["addr"]: item for item in devices}
+        self.requests: dict[str, int] = {}
+        """
+        The number of requests received per type.
+        """
+
+        self.subscribed = asyncio.Event()
+        """
+        Set once a client subscribes to the statuses.
+        """
+
+        self._key = key
+        self._subscribers: dict[ServerConnection, set[str]] = {}
+        self._server: Server | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        self._server = await serve(self._handle, host, port, max_size=None)
+
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def emit(self, statuses: list[dict]) -> None:
+        """
+        Apply the `{"addr": ..., "status": ...}` updates and send them to
+        the subscribers as a `statuses` event.
+        """
+        for update in statuses:
+            self.devices[update["addr"]]["status"].update(update["status"])
+
+        for connection, addrs in tuple(self._subscribers.items()):
+            devices = [update for update in statuses if update["addr"] in addrs]
+
+            if devices:
+                await connection.send(json_dumps({"event": "statuses", "devices": devices}), text=True)
+
+    async def _handle(self, connection: ServerConnection) -> None:
+        authorized = False
+
+        try:
+            async for frame in connection:
+                message = json_loads(frame)
+                request = message["request"]
+                self.requests[request] = self.requests.get(request, 0) + 1
+
+                if request == "authorize":
+                    authorized = message.get("key") == self._key
+                    await self._respond(connection, request, result="success" if authorized else "error")
+                elif not authorized:
+                    await self._respond(connection, request, result="error")
+                elif request == "get-devices":
+                    await self._respond(
+                        connection,
+                        request,
+                        found=len(self.devices),
+                        devices=list(self.devices.values()),
+                    )
+                elif request == "status-subscribe":
+                    # Adds to the devices subscribed to before.
+                    addrs = set(message["addr"])
+                    self._subscribers.setdefault(connection, set()).update(addrs)
+                    await self._respond(
+                        connection,
+                        request,
+                        found=len(addrs),
+                        subscribed=len(addrs),
+                        devices=[{"addr": addr} for addr in addrs],
+                    )
+                    self.subscribed.set()
+                elif request == "status-set":
+                    await self._on_status_set(connection, message)
+        finally:
+            self._subscribers.pop(connection, None)
+
+    async def _on_status_set(self, connection: ServerConnection, message: dict) -> None:
+        addrs = message["addr"] if isinstance(message["addr"], list) else [message["addr"]]
+        known = [addr for addr in addrs if addr in self.devices]
+
+        await self._respond(
+            connection,
+            "status-set",
+            devices=[{"addr": addr, "success": addr in self.devices} for addr in addrs],
+        )
+        # The hub reports the changes it made.
+        await self.emit([
+            {"addr": addr, "status": {**self.devices[addr]["status"], **message["status"]}}
+            for addr in known
+        ])
+
+    @staticmethod
+    async def _respond(connection: ServerConnection, request: str, **data) -> None:
+        await connection.send(json_dumps({"response": request, **data}), text=True)
+
+
+__all__ = [
+    "LarnitechHubSimulator",
+]
@@ -0,0 +1,195 @@
+import asyncio
+from struct import pack, unpack_from
+from typing import Callable
+
+
+class MqttBroker:
+    """
+    A minimal in-process MQTT 3.1.1 broker for benchmarking: QoS 0 and 1 in,
+    QoS 0 out, retained messages, `+`/`#` wildcards, no persistence, no auth.
+    """
+
+    def __init__(self) -> None:
+        self.listeners: list[Callable[[str, bytes], None]] = []
+        """
+        Called with every message published to the broker.
+        """
+
+        self.packets: dict[str, int] = {}
+        """
+        The number of packets received per type.
+        """
+
+        self._retained: dict[str, bytes] = {}
+        self._subscriptions: dict[asyncio.StreamWriter, list[str]] = {}
+        self._server: asyncio.Server | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+        self._server = await asyncio.start_server(self._handle, host, port)
+
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self._server.close()
+
+        for writer in tuple(self._subscriptions):
+            writer.close()
+
+    def publish(self, topic: str, payload: bytes, retain: bool = False) -> None:
+        """
+        Publish the message as if it came from a client.
+        """
+        for listener in self.listeners:
+            listener(topic, payload)
+
+        if retain:
+            if payload:
+                self._retained[topic] = payload
+            else:
+                self._retained.pop(topic, None)
+
+        packet = self._packet(0x30, self._string(topic) + payload)
+
+        for writer, filters in self._subscriptions.items():
+            if any(_matches(topic_filter, topic) for topic_filter in filters):
+                writer.write(packet)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._subscriptions[writer] = []
+
+        try:
+            while True:
+                header = (await reader.readexactly(1))[0]
+                body = await reader.readexactly(await self._read_length(reader))
+                kind = header >> 4
+                name = _PACKETS.get(kind, str(kind))
+                self.packets[name] = self.packets.get(name, 0) + 1
+
+                if kind == 1:
+                    # CONNECT: accept anyone.
+                    writer.write(b"\x20\x02\x00\x00")
+                elif kind == 3:
+                    self._on_publish(writer, header, body)
+                elif kind == 8:
+                    self._on_subscribe(writer, body)
+                elif kind == 10:
+                    self._on_unsubscribe(writer, body)
+                elif kind == 12:
+                    writer.write(b"\xd0\x00")
+                elif kind == 14:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            del self._subscriptions[writer]
+            writer.close()
+
+    def _on_publish(self, writer: asyncio.StreamWriter, header: int, body: bytes) -> None:
+        qos = (header >> 1) & 0x03
+        topic, offset = self._read_string(body, 0)
+
+        if qos:
+            packet_id, = unpack_from("!H", body, offset)
+            offset += 2
+            writer.write(b"\x40\x02" + pack("!H", packet_id))
+
+        self.publish(topic, body[offset:], retain=bool(header & 0x01))
+
+    def _on_subscribe(self, writer: asyncio.StreamWriter, body: bytes) -> None:
+        packet_id, = unpack_from("!H", body, 0)
+        offset = 2
+        filters = []
+
+        while offset < len(body):
+            topic_filter, offset = self._read_string(body, offset)
+            # Skip the requested QoS, only 0 is granted.
+            offset += 1
+            filters.append(topic_filter)
+
+        self._subscriptions[writer].extend(filters)
+        writer.write(self._packet(0x90, pack("!H", packet_id) + b"\x00" * len(filters)))
+
+        for topic, payload in self._retained.items():
+            if any(_matches(topic_filter, topic) for topic_filter in filters):
+                writer.write(self._packet(0x31, self._string(topic) + payload))
+
+    def _on_unsubscribe(self, writer: asyncio.StreamWriter, body: bytes) -> None:
+        packet_id, = unpack_from("!H", body, 0)
+        offset = 2
+
+        while offset < len(body):
+            topic_filter, offset = self._read_string(body, offset)
+
+            if topic_filter in self._subscriptions[writer]:
+                self._subscriptions[writer].remove(topic_filter)
+
+        writer.write(b"\xb0\x02" + pack("!H", packet_id))
+
+    @staticmethod
+    async def _read_length(reader: asyncio.StreamReader) -> int:
+        length = 0
+
+        for shift in range(0, 28, 7):
+            byte = (await reader.readexactly(1))[0]
+            length |= (byte & 0x7f) << shift
+
+            if not byte & 0x80:
+                break
+
+        return length
+
+    @staticmethod
+    def _read_string(data: bytes, offset: int) -> tuple[str, int]:
+        size, = unpack_from("!H", data, offset)
+
+        return data[offset + 2:offset + 2 + size].decode(), offset + 2 + size
+
+    @staticmethod
+    def _string(value: str) -> bytes:
+        encoded = value.encode()
+
+        return pack("!H", len(encoded)) + encoded
+
+    @staticmethod
+    def _packet(header: int, body: bytes) -> bytes:
+        length = len(body)
+        encoded = bytearray()
+
+        while True:
+            byte = length & 0x7f
+            length >>= 7
+            encoded.append(byte | 0x80 if length else byte)
+
+            if not length:
+                break
+
+        return bytes((header,)) + bytes(encoded) + body
+
+
+_PACKETS = {
+    1: "CONNECT",
+    3: "PUBLISH",
+    8: "SUBSCRIBE",
+    10: "UNSUBSCRIBE",
+    12: "PINGREQ",
+    14: "DISCONNECT",
+}
+
+
+def _matches(topic_filter: str, topic: str) -> bool:
+    filter_levels = topic_filter.split("/")
+    topic_levels = topic.split("/")
+
+    for i, level in enumerate(filter_levels):
+        if level == "#":
+            return True
+
+        if i >= len(topic_levels) or (level != "+" and level != topic_levels[i]):
+            return False
+
+    return len(filter_levels) == len(topic_levels)
+
+
+__all__ = [
+    "MqttBroker",
+]
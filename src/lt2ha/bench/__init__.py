@@ -0,0 +1,15 @@
+"""
+Benchmarks for the bridge's hot paths.
+
+Every module here is runnable on its own, e.g.
+`python -m lt2ha.bench.status_set_queue`. The end-to-end suite is also
+available as `lt2ha-bench`.
+"""
+from .LarnitechHubSimulator import LarnitechHubSimulator
+from .MqttBroker import MqttBroker
+
+
+__all__ = [
+    "LarnitechHubSimulator",
+    "MqttBroker",
+]
@@ -0,0 +1,82 @@
+"""
+Compares the JSON codec against the stdlib path it replaced, on a synthetic
+`get-devices` response, a burst of `statuses` events and the discovery
+configs published to MQTT.
+"""
+from json import dumps as std_json_dumps, loads as std_json_loads
+from timeit import Timer
+from typing import Any, Callable
+
+from ..codec import json_dumps, json_loads, orjson
+from .fixtures import make_devices, make_statuses_events
+
+
+def _std_loads(frame: bytes) -> Any:
+    # The decoding as it was in `LarnitechMqttBridge._ws_receive()`.
+    return std_json_loads(frame.decode("utf-8", errors="ignore"), strict=False)
+
+
+def _measure(func: Callable[[], Any], repeat: int) -> float:
+    number, _ = Timer(func).autorange()
+
+    return min(Timer(func).repeat(repeat, number)) / number
+
+
+def _report(name: str, baseline: Callable[[], Any], candidate: Callable[[], Any], repeat: int) -> None:
+    before = _measure(baseline, repeat)
+    after = _measure(candidate, repeat)
+    print(f"{name:<24} stdlib {before * 1e6:>10.1f} µs  codec {after * 1e6:>10.1f} µs  x{before / after:.1f}")
+
+
+def main() -> None:
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser()
+    parser.add_argument("--devices", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    devices = make_devices(args.devices)
+    get_devices = std_json_dumps({
+        "response": "get-devices",
+        "found": len(devices),
+        "devices": devices,
+    }).encode()
+    statuses = [std_json_dumps(event).encode() for event in make_statuses_events(devices, args.events)]
+    configs = [
+        {
+            "state_topic": f"larnitech/{i}/state",
+            "command_topic": f"larnitech/{i}/set",
+            "payload_on": "on",
+            "payload_off": "off",
+            "name": item["name"],
+            "unique_id": f"larnitech_{i}",
+            "device": {"name": "Larnitech", "identifiers": [item["area"]], "suggested_area": item["area"]},
+        }
+        for i, item in enumerate(devices)
+    ]
+
+    print(f"orjson: {'yes' if orjson else 'no'}, get-devices: {len(get_devices) / 1024:.0f} KiB")
+    _report(
+        "get-devices (loads)",
+        lambda: _std_loads(get_devices),
+        lambda: json_loads(get_devices),
+        args.repeat,
+    )
+    _report(
+        f"{args.events} statuses (loads)",
+        lambda: [_std_loads(frame) for frame in statuses],
+        lambda: [json_loads(frame) for frame in statuses],
+        args.repeat,
+    )
+    _report(
+        f"{len(configs)} configs (dumps)",
+        lambda: [std_json_dumps(config) for config in configs],
+        lambda: [json_dumps(config) for config in configs],
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Measures the time and the memory it takes to turn a `get-devices` response
+into the device models, the way `LarnitechMqttBridge._lt_on_get_devices()`
+does, and the peak memory of decoding the response whole vs. lazily.
+"""
+import gc
+import tracemalloc
+from timeit import Timer
+
+from ..codec import json_dumps, json_loads, json_loads_lazy
+from ..device import group
+from ..LarnitechConfig import LarnitechConfig
+from .fixtures import make_devices
+
+
+def main() -> None:
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser()
+    parser.add_argument("--devices", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    config = LarnitechConfig(
+        host="",
+        port=0,
+        key="",
+        ignored_addrs=(),
+        ignored_types=("com-port",),
+        ignored_areas=(),
+    )
+    payload = json_dumps({
+        "response": "get-devices",
+        "found": args.devices,
+        "devices": make_devices(args.devices),
+    })
+
+    # Each run parses its own items, as the bridge does.
+    items = json_loads(payload)["devices"]
+    timer = Timer(lambda: group(json_loads(payload)["devices"], config))
+    number, _ = timer.autorange()
+    total = min(timer.repeat(args.repeat, number)) / number
+    timer = Timer(lambda: json_loads(payload))
+    number, _ = timer.autorange()
+    parse = min(timer.repeat(args.repeat, number)) / number
+
+    # The items are alive anyway (the devices share their `status`),
+    # so only the memory allocated by the models themselves is counted.
+    gc.collect()
+    tracemalloc.start()
+    to_register, to_ignore = group(items, config)
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"get-devices: {len(payload) / 1024:.0f} KiB, {len(to_register)} devices, {len(to_ignore)} ignored")
+    print(f"construction: {(total - parse) * 1000:.2f} ms ({(total - parse) / len(items) * 1e6:.2f} µs per item)")
+    print(f"memory: {size / 1024:.0f} KiB ({size / len(to_register):.0f} B per device), peak {peak / 1024:.0f} KiB")
+
+    del items, to_register, to_ignore
+
+    for name, decode in (
+        ("whole", lambda frame: json_loads(frame)["devices"]),
+        ("lazy", lambda frame: json_loads_lazy(frame, "devices")["devices"]),
+    ):
+        timer = Timer(lambda: group(decode(payload), config))
+        number, _ = timer.autorange()
+        total = min(timer.repeat(args.repeat, number)) / number
+
+        # Everything from the received frame to the models, with the frame
+        # held as long as the decoder needs it.
+        gc.collect()
+        tracemalloc.start()
+        devices = group(decode(bytes(memoryview(payload))), config)
+        size, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del devices
+
+        print(
+            f"decode {name}: {total * 1000:.2f} ms, "
+            f"peak {peak / 1024:.0f} KiB ({(peak - size) / 1024:.0f} KiB over the models)"
+        )
+
+
+if __name__ == "__main__":
+    main()
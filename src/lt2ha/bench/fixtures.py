@@ -0,0 +1,105 @@
+"""
+Synthetic Larnitech installs, shaped as the API2 `get-devices` items.
+"""
+from random import Random
+from typing import Any, Callable
+
+_AUTOMATIONS = ["Comfort", "Eco", "Night"]
+
+_STATUSES: dict[str, Callable[[Random], dict[str, Any]]] = {
+    "temperature-sensor": lambda r: {"state": round(r.uniform(18, 26), 1)},
+    "humidity-sensor": lambda r: {"state": round(r.uniform(30, 60), 1)},
+    "motion-sensor": lambda r: {"state": r.choice((0.0, 0.0, 12.5))},
+    "leak-sensor": lambda r: {"state": "ok"},
+    "valve-heating": lambda r: {
+        "state": "on",
+        "automation": r.choice(_AUTOMATIONS),
+        "current": round(r.uniform(18, 24), 1),
+        "target": r.choice((21, 21.5, 22)),
+    },
+    "lamp": lambda r: {"state": r.choice(("on", "off"))},
+    "dimmer-lamp": lambda r: {"state": "on", "level": r.randint(0, 100)},
+    "script": lambda r: {"state": "off"},
+    "valve": lambda r: {"state": r.choice(("opened", "closed"))},
+    "virtual": lambda r: {"state": r.randint(0, 10), "mode": "auto"},
+}
+
+
+def make_devices(count: int, seed: int = 0) -> list[dict]:
+    """
+    Make the `count` devices of all supported types (and some unsupported),
+    spread over the areas. Every area gets a two-speed air fan.
+    """
+    rnd = Random(seed)
+    types = tuple(_STATUSES)
+    devices = []
+    area = 0
+
+    while len(devices) < count:
+        area += 1
+        area_name = f"Room {area}"
+
+        # Two `script` with the `air-fan` sub-type make a multispeed fan.
+        for speed in (1, 2):
+            devices.append({
+                "addr": f"{area}:{speed}",
+                "name": "Fan",
+                "area": area_name,
+                "type": "script",
+                "sub-type": "air-fan",
+                "status": {"state": "off"},
+            })
+
+        for i in range(3, 3 + min(20, count - len(devices))):
+            item_type = rnd.choice(types)
+            item = {
+                "addr": f"{area}:{i}",
+                "name": f"{item_type} {i}",
+                "area": area_name,
+                "type": item_type,
+                "status": _STATUSES[item_type](rnd),
+            }
+
+            if item_type == "valve-heating":
+                item["automations"] = _AUTOMATIONS
+
+            devices.append(item)
+
+    return devices[:count]
+
+
+def make_status(item: dict, rnd: Random) -> dict:
+    """
+    Make a random status update for the `item`.
+    """
+    sub_type = item.get("sub-type")
+
+    if sub_type == "air-fan":
+        return {"state": rnd.choice(("on", "off"))}
+
+    return _STATUSES[item["type"]](rnd)
+
+
+def make_statuses_events(devices: list[dict], count: int, per_event: int = 1, seed: int = 0) -> list[dict]:
+    """
+    Make the `count` of `statuses` events for random `devices`.
+    """
+    rnd = Random(seed)
+
+    return [
+        {
+            "event": "statuses",
+            "devices": [
+                {"addr": item["addr"], "status": make_status(item, rnd)}
+                for item in rnd.sample(devices, per_event)
+            ],
+        }
+        for _ in range(count)
+    ]
+
+
+__all__ = [
+    "make_devices",
+    "make_status",
+    "make_statuses_events",
+]
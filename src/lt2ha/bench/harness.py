@@ -0,0 +1,60 @@
+"""
+The bridge wired to the local stand-ins of the hub and the broker.
+"""
+
+from paho.mqtt.client import MQTTProtocolVersion
+
+from ..bridge import LarnitechMqttBridge, LarnitechMqttBridgeGroup
+from ..LarnitechConfig import LarnitechConfig
+from ..metrics import Metrics
+from ..mqtt import Mqtt, MqttClient, MqttDiscovery, MqttSubscribeMode
+from ..TrafficRecorder import TrafficRecorder
+
+
+async def make_bridge(
+    hub_port: int,
+    broker_port: int,
+    key: str,
+    command_window: float,
+    metrics: Metrics,
+    recorder: TrafficRecorder | None = None,
+    subscribe_mode: MqttSubscribeMode = "wildcard",
+    state_qos: int = 0,
+    inflight: int = 100,
+) -> LarnitechMqttBridgeGroup:
+    mqtt = Mqtt(
+        client=MqttClient(
+            client_id="lt2ha-bench",
+            host="127.0.0.1",
+            port=broker_port,
+            username="",
+            password="",
+            protocol=MQTTProtocolVersion.MQTTv311,
+            transport="tcp",
+            inflight=inflight,
+        ),
+        discovery=MqttDiscovery(prefix="homeassistant"),
+        subscribe_mode=subscribe_mode,
+        state_qos=state_qos,
+    )
+    bridge = LarnitechMqttBridge(
+        mqtt=mqtt,
+        larnitech=LarnitechConfig(
+            host="127.0.0.1",
+            port=hub_port,
+            key=key,
+            ignored_addrs=(),
+            ignored_types=("com-port",),
+            ignored_areas=(),
+            command_window=command_window,
+        ),
+        metrics=metrics,
+        recorder=recorder,
+    )
+
+    return LarnitechMqttBridgeGroup(mqtt, [bridge], metrics)
+
+
+__all__ = [
+    "make_bridge",
+]
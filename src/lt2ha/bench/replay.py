@@ -0,0 +1,173 @@
+"""
+Replays a capture made with `lt2ha-bridge --record PATH` against the bridge,
+with the recorded hub responses and events served by a local websocket and
+the recorded HA commands published to the in-process MQTT broker.
+
+    python -m lt2ha.bench.replay capture.jsonl.gz --speed 10
+"""
+import asyncio
+import logging
+from collections import deque
+from time import perf_counter
+
+from websockets.asyncio.server import ServerConnection, serve
+
+from ..codec import json_dumps, json_loads
+from ..metrics import Metrics
+from ..TrafficRecorder import TrafficRecorder
+from .MqttBroker import MqttBroker
+from .harness import make_bridge
+
+
+class _ReplayHub:
+    """
+    Answers the bridge's requests with the recorded responses. The commands
+    are always confirmed since the bridge may batch them differently than
+    it did when recording.
+    """
+
+    def __init__(self, responses: dict[str, deque[str]]) -> None:
+        self._responses = responses
+        self._connection: ServerConnection | None = None
+
+    async def start(self) -> int:
+        server = await serve(self._handle, "127.0.0.1", 0, max_size=None)
+
+        return server.sockets[0].getsockname()[1]
+
+    async def send(self, frame: str) -> None:
+        await self._connection.send(_to_bytes(frame), text=True)
+
+    async def _handle(self, connection: ServerConnection) -> None:
+        async for frame in connection:
+            message = json_loads(frame)
+            request = message["request"]
+
+            if request == "status-set":
+                addrs = message["addr"] if isinstance(message["addr"], list) else [message["addr"]]
+                await connection.send(
+                    json_dumps({
+                        "response": request,
+                        "devices": [{"addr": addr, "success": True} for addr in addrs],
+                    }),
+                    text=True,
+                )
+            elif self._responses.get(request):
+                await connection.send(_to_bytes(self._responses[request].popleft()), text=True)
+            else:
+                raise RuntimeError(f"The capture has no response to {request}")
+
+            if request == "status-subscribe":
+                self._connection = connection
+
+
+def _to_bytes(frame: str) -> bytes:
+    return frame.encode("utf-8", errors="surrogateescape")
+
+
+def _load(path: str, segment: int) -> tuple[dict[str, deque[str]], list[tuple[float, str, object]]]:
+    """
+    Split the segment into the responses to the startup requests
+    and the stream of events and commands after the subscription.
+    """
+    responses: dict[str, deque[str]] = {}
+    stream = []
+    current = -1
+    subscribed = False
+
+    for time, channel, data in TrafficRecorder.read(path):
+        if channel == TrafficRecorder.START:
+            current += 1
+        elif current == segment:
+            if channel == TrafficRecorder.LT_IN:
+                response = json_loads(_to_bytes(data)).get("response")
+
+                if response and response != "status-set":
+                    responses.setdefault(response, deque()).append(data)
+                    subscribed = subscribed or response == "status-subscribe"
+                elif not response and subscribed:
+                    stream.append((time, channel, data))
+            elif channel == TrafficRecorder.MQTT_IN and subscribed:
+                stream.append((time, channel, data))
+
+    return responses, stream
+
+
+async def _replay(args) -> None:
+    logging.getLogger("lt2ha.bridge").setLevel(logging.WARNING)
+
+    responses, stream = _load(args.path, args.segment)
+    events = sum(channel == TrafficRecorder.LT_IN for _, channel, _ in stream)
+    commands = len(stream) - events
+
+    if not stream:
+        print("Nothing to replay after the subscription")
+        return
+
+    hub = _ReplayHub(responses)
+    broker = MqttBroker()
+    hub_port = await hub.start()
+    broker_port = await broker.start()
+    metrics = Metrics()
+    # The key doesn't matter, the recorded `authorize` response is served.
+    bridge = await make_bridge(hub_port, broker_port, "", args.command_window, metrics)
+    bridge_task = asyncio.create_task(bridge.run())
+
+    try:
+        # The bridge takes the commands once HA is primed, after subscribing.
+        await asyncio.wait_for(bridge.primed(), args.timeout)
+
+        origin = perf_counter()
+        first = stream[0][0]
+
+        for time, channel, data in stream:
+            if args.speed > 0:
+                await asyncio.sleep(max(0.0, origin + (time - first) / args.speed - perf_counter()))
+
+            if channel == TrafficRecorder.LT_IN:
+                await hub.send(data)
+            else:
+                topic, payload = data
+                broker.publish(topic, _to_bytes(payload))
+
+        sent = perf_counter()
+
+        # Wait for the bridge to process everything that was sent.
+        while perf_counter() - sent < args.timeout and (
+            metrics.lt_frames.get("larnitech", "statuses") < events
+            or metrics.ha_commands.get("larnitech") < commands
+            or metrics.commands_pending.get("larnitech") > 0
+        ):
+            await asyncio.sleep(0.001)
+
+        done = perf_counter()
+        published = metrics.ha_publishes.get("larnitech", "published")
+        latency = metrics.command_latency
+
+        print(f"recorded: {stream[-1][0] - first:.2f}s, {events} events, {commands} commands")
+        print(f"replayed: {done - origin:.2f}s at {'max' if args.speed <= 0 else f'x{args.speed:g}'} speed, lag {(done - sent) * 1000:.1f} ms")
+        print(f"events: {events / (done - origin):.0f}/s, {published:.0f} states published, {metrics.ha_publishes.get('larnitech', 'unchanged'):.0f} unchanged")
+
+        if latency.count("larnitech"):
+            print(f"commands: mean latency {latency.sum('larnitech') / latency.count('larnitech') * 1000:.2f} ms over {latency.count('larnitech')}")
+    finally:
+        bridge_task.cancel()
+        await asyncio.gather(bridge_task, return_exceptions=True)
+        await broker.stop()
+
+
+def main() -> None:
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser()
+    parser.add_argument("path")
+    parser.add_argument("--speed", type=float, default=1, help="The replay speed factor, 0 for as fast as possible.")
+    parser.add_argument("--segment", type=int, default=0, help="The bridge run to replay when the capture has several.")
+    parser.add_argument("--command-window", type=float, default=0.02)
+    parser.add_argument("--timeout", type=float, default=30)
+
+    asyncio.run(_replay(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
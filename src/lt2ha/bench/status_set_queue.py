@@ -0,0 +1,133 @@
+"""
+Measures the latency between an MQTT command being handed to the bridge
+and the corresponding `status-set` being written to the Larnitech websocket,
+as well as the number of event loop wakeups while the bridge is idle.
+"""
+import asyncio
+import logging
+from json import loads as json_loads
+from selectors import DefaultSelector
+from statistics import quantiles
+from time import perf_counter_ns, process_time
+from types import SimpleNamespace
+
+from paho.mqtt.client import MQTTMessage
+
+from ..bridge import LarnitechMqttBridge
+from ..device import LarnitechToggleable
+from ..LarnitechConfig import LarnitechConfig
+
+
+class _CountingSelector(DefaultSelector):
+    wakeups = 0
+
+    def select(self, timeout=None):
+        self.wakeups += 1
+        return super().select(timeout)
+
+
+class _WsSink:
+    def __init__(self, count: int) -> None:
+        self.sent_at: dict[int, int] = {}
+        self.done = asyncio.Event()
+        self._last = str(count - 1)
+
+    async def send(self, message: bytes, text: bool | None = None) -> None:
+        # The commands carry their sequence number as the state.
+        state = json_loads(message)["status"]["state"]
+        self.sent_at[int(state)] = perf_counter_ns()
+
+        if state == self._last:
+            self.done.set()
+
+
+def _make_bridge() -> LarnitechMqttBridge:
+    bridge = LarnitechMqttBridge(
+        mqtt=SimpleNamespace(client=SimpleNamespace(), discovery=None),
+        larnitech=LarnitechConfig(
+            host="localhost",
+            port=2041,
+            key="",
+            ignored_addrs=(),
+            ignored_types=(),
+            ignored_areas=(),
+            command_window=0,
+        ),
+    )
+    device = LarnitechToggleable({
+        "addr": "100:1",
+        "name": "Lamp",
+        "area": "Bench",
+        "type": "lamp",
+        "status": {"state": "off"},
+    })
+    # noinspection PyProtectedMember
+    bridge._devices.add(device)
+    # noinspection PyProtectedMember
+    bridge._routes.add(device.addr, {"larnitech/100_1/set": (device, None)})
+
+    return bridge
+
+
+async def _produce(bridge: LarnitechMqttBridge, count: int, interval: float, sent_at: list[int]) -> None:
+    message = MQTTMessage(topic=b"larnitech/100_1/set")
+
+    for i in range(count):
+        message.payload = str(i).encode()
+        await asyncio.sleep(interval)
+        sent_at.append(perf_counter_ns())
+        # noinspection PyProtectedMember
+        bridge._notify_lt(message)
+
+
+# noinspection PyProtectedMember
+async def _bench(selector: _CountingSelector, count: int, interval: float, idle: float) -> None:
+    bridge = _make_bridge()
+    bridge._loop = asyncio.get_running_loop()
+    bridge._registered = True
+    bridge._ws = ws = _WsSink(count)
+    consumer = asyncio.create_task(bridge._process_status_set_queue())
+
+    # Idle: nothing arrives from MQTT.
+    await asyncio.sleep(0)
+    wakeups = selector.wakeups
+    cpu = process_time()
+    await asyncio.sleep(idle)
+    # The `sleep` above costs a couple of wakeups on its own.
+    idle_wakeups = selector.wakeups - wakeups
+    idle_cpu = process_time() - cpu
+
+    # Busy: commands arrive on the loop, as the MQTT client runs on it.
+    queued_at: list[int] = []
+    await asyncio.gather(_produce(bridge, count, interval, queued_at), ws.done.wait())
+    consumer.cancel()
+
+    latencies = [(sent - queued_at[i]) / 1000 for i, sent in ws.sent_at.items()]
+    p50, p90, p99 = (quantiles(latencies, n=100)[i] for i in (49, 89, 98))
+
+    print(f"idle:    {idle_wakeups} wakeups, {idle_cpu * 1000:.2f} ms CPU in {idle:.1f} s")
+    print(f"sent:    {len(latencies)} of {count} ({count - len(latencies)} coalesced)")
+    print(f"latency: p50={p50:.1f} µs p90={p90:.1f} µs p99={p99:.1f} µs max={max(latencies):.1f} µs")
+
+
+def main() -> None:
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser()
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--interval", type=float, default=0.001)
+    parser.add_argument("--idle", type=float, default=2.0)
+    args = parser.parse_args()
+
+    logging.getLogger("lt2ha.bridge").setLevel(logging.WARNING)
+    selector = _CountingSelector()
+    loop = asyncio.SelectorEventLoop(selector)
+
+    try:
+        loop.run_until_complete(_bench(selector, args.count, args.interval, args.idle))
+    finally:
+        loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+End-to-end benchmark of the bridge against the simulated Larnitech hub and
+the in-process MQTT broker.
+
+Reports the startup time to the first state and to all of them, the
+sustained rate of the `statuses` events turned into MQTT publishes along
+with their latency, and the round-trip latency of the commands from HA
+until their new state comes back.
+"""
+import asyncio
+import logging
+from statistics import quantiles
+from time import perf_counter
+from typing import get_args
+
+from ..metrics import Metrics
+from ..mqtt import MqttSubscribeMode
+from ..TrafficRecorder import TrafficRecorder
+from ..utils import to_id
+from .LarnitechHubSimulator import LarnitechHubSimulator
+from .MqttBroker import MqttBroker
+from .fixtures import make_devices
+from .harness import make_bridge
+
+
+class _Observer:
+    """
+    Timestamps the state publishes that reach the broker.
+    """
+
+    def __init__(self) -> None:
+        self.first_state: float | None = None
+        self.states = 0
+        self._expected: dict[tuple[str, bytes], asyncio.Future[float]] = {}
+
+    def expect(self, topic: str, payload: bytes) -> asyncio.Future[float]:
+        future = self._expected[(topic, payload)] = asyncio.get_running_loop().create_future()
+
+        return future
+
+    def __call__(self, topic: str, payload: bytes) -> None:
+        if not topic.endswith("/state"):
+            return
+
+        now = perf_counter()
+        self.states += 1
+
+        if self.first_state is None:
+            self.first_state = now
+
+        future = self._expected.pop((topic, payload), None)
+
+        if future and not future.done():
+            future.set_result(now)
+
+
+def _report(name: str, values: list[float]) -> None:
+    if len(values) < 2:
+        print(f"{name}: not enough samples")
+        return
+
+    p50, p90, p99 = (quantiles(values, n=100)[i] * 1000 for i in (49, 89, 98))
+    print(f"{name}: p50={p50:.2f} ms p90={p90:.2f} ms p99={p99:.2f} ms max={max(values) * 1000:.2f} ms")
+
+
+def _state_topic(addr: str) -> str:
+    return f"larnitech/{to_id(addr)}/state"
+
+
+async def _bench_events(
+    hub: LarnitechHubSimulator,
+    observer: _Observer,
+    count: int,
+    rate: float,
+    timeout: float,
+) -> None:
+    sensors = [item for item in hub.devices.values() if item["type"] == "temperature-sensor"]
+    pending = []
+    sent_at = []
+
+    for i in range(count):
+        if rate > 0 and sent_at:
+            # Keep the pace, without accumulating the drift.
+            await asyncio.sleep(max(0.0, sent_at[0] + i / rate - perf_counter()))
+
+        item = sensors[i % len(sensors)]
+        # A unique value per event, so none is skipped as unchanged.
+        value = 1000 + i
+        pending.append(observer.expect(_state_topic(item["addr"]), str(value).encode()))
+        sent_at.append(perf_counter())
+        await hub.emit([{"addr": item["addr"], "status": {"state": value}}])
+
+    done, _ = await asyncio.wait(pending, timeout=timeout)
+    received = [(future.result(), started) for future, started in zip(pending, sent_at) if future in done]
+
+    if not received:
+        print("events: nothing was published")
+        return
+
+    elapsed = max(at for at, _ in received) - sent_at[0]
+    print(f"events: {len(received)}/{count} published, {len(received) / elapsed:.0f} events/s")
+    _report("event to publish", [at - started for at, started in received])
+
+
+async def _bench_commands(
+    hub: LarnitechHubSimulator,
+    broker: MqttBroker,
+    observer: _Observer,
+    count: int,
+    timeout: float,
+) -> None:
+    lamps = [item for item in hub.devices.values() if item["type"] == "lamp"]
+    latencies = []
+
+    for i in range(count):
+        item = lamps[i % len(lamps)]
+        value = "off" if item["status"]["state"] == "on" else "on"
+        future = observer.expect(_state_topic(item["addr"]), value.encode())
+        started = perf_counter()
+        broker.publish(f"larnitech/{to_id(item['addr'])}/set", value.encode())
+
+        try:
+            latencies.append(await asyncio.wait_for(future, timeout) - started)
+        except TimeoutError:
+            print(f"commands: no state for {item['addr']} in {timeout}s")
+
+    _report(f"command round trip ({len(latencies)})", latencies)
+
+
+async def _bench(args) -> None:
+    logging.getLogger("lt2ha.bridge").setLevel(logging.WARNING)
+
+    hub = LarnitechHubSimulator(make_devices(args.devices, seed=args.seed), key="bench")
+    broker = MqttBroker()
+    observer = _Observer()
+    broker.listeners.append(observer)
+    hub_port = await hub.start()
+    broker_port = await broker.start()
+
+    started = perf_counter()
+    metrics = Metrics()
+    bridge = await make_bridge(
+        hub_port,
+        broker_port,
+        "bench",
+        args.command_window,
+        metrics,
+        TrafficRecorder(args.record) if args.record else None,
+        args.subscribe_mode,
+        args.state_qos,
+        args.inflight,
+    )
+    bridge_task = asyncio.create_task(bridge.run())
+
+    try:
+        await asyncio.wait_for(hub.subscribed.wait(), args.timeout)
+
+        while observer.first_state is None:
+            await asyncio.sleep(0.01)
+
+        print(
+            (
+                f"install: {len(hub.devices)} devices, {sum(broker.packets.values())} MQTT packets at startup, "
+                f"{broker.packets.get('SUBSCRIBE', 0)} of them SUBSCRIBE"
+            ),
+        )
+        await asyncio.wait_for(bridge.primed(), args.timeout)
+
+        # With QoS 0, the states are only written to the socket by then.
+        published = metrics.ha_publishes.get("larnitech", "published")
+
+        async with asyncio.timeout(args.timeout):
+            while observer.states < published:
+                await asyncio.sleep(0.001)
+
+        print(
+            (
+                f"startup: first state in {(observer.first_state - started) * 1000:.0f} ms, "
+                f"all {observer.states} in {(perf_counter() - started) * 1000:.0f} ms"
+            ),
+        )
+
+        await _bench_events(hub, observer, args.events, args.rate, args.timeout)
+        await _bench_commands(hub, broker, observer, args.commands, args.timeout)
+        print(f"reconnects: {metrics.lt_reconnects.get('larnitech'):.0f}")
+    finally:
+        bridge_task.cancel()
+        await asyncio.gather(bridge_task, return_exceptions=True)
+        await hub.stop()
+        await broker.stop()
+
+
+def main() -> None:
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(prog="lt2ha-bench")
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--rate", type=float, default=0, help="Events per second, as fast as possible by default.")
+    parser.add_argument("--commands", type=int, default=200)
+    parser.add_argument("--command-window", type=float, default=0.02)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--subscribe-mode", default="wildcard", choices=get_args(MqttSubscribeMode))
+    parser.add_argument("--state-qos", type=int, default=0, choices=(0, 1))
+    parser.add_argument("--inflight", type=int, default=100)
+    parser.add_argument("--record", metavar="PATH", help="Capture the traffic for `lt2ha.bench.replay`.")
+
+    asyncio.run(_bench(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,37 @@
 import asyncio
 import logging
-from json import dumps as json_dumps, loads as json_loads
+import os
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import replace
+from re import fullmatch
 from sys import stdout
-from typing import Any, Callable
-from queue import Queue as ThreadSafeQueue
+from time import monotonic, perf_counter
+from typing import Any, Callable, get_args
 
-from paho.mqtt.client import MQTTMessage, MQTTProtocolVersion
-from websockets import ClientConnection as WsClientConnection
+from paho.mqtt.client import MQTTErrorCode, MQTTMessage, MQTTProtocolVersion
+from websockets import ClientConnection as WsClientConnection, ConnectionClosed, InvalidHandshake, State
 
 from .device import LarnitechDevice, LarnitechDeviceRegistry, LarnitechDeviceWrapper, group
-from .mqtt import Mqtt, MqttClient, MqttDiscovery
+from .mqtt import (
+    Mqtt,
+    MqttAckTracker,
+    MqttClient,
+    MqttDiscovery,
+    MqttDiscoveryCache,
+    MqttInflightWindow,
+    MqttPublishCache,
+    MqttPublishFilter,
+    MqttStateSnapshot,
+    MqttSubscribeMode,
+    MqttTopicRouter,
+)
+from .LarnitechCommandQueue import LarnitechCommandQueue
 from .LarnitechConfig import LarnitechConfig
+from .LarnitechStateFilter import LarnitechStateFilter
+from .TrafficRecorder import TrafficRecorder
+from .codec import json_dumps, json_loads, json_loads_lazy
+from .metrics import Metrics, MetricsServer
 from .utils import build_topic, to_id
 
 
@@ -21,35 +42,121 @@ _LOGGER.addHandler(logging.StreamHandler(stdout))
 
 _PREFIX = "larnitech"
 
+# The time (in seconds) for the broker to acknowledge the registration.
+_REGISTRATION_TIMEOUT = 10
+# The time (in seconds) for the broker to take the next state while priming
+# HA, after which the states in flight are considered lost.
+_PRIME_STALL_TIMEOUT = 10
+# The time (in seconds) HA may take to set up the newly discovered entities.
+_DISCOVERY_SETTLE_TIME = 3
+# The bounds (in seconds) of the exponential backoff between reconnects to LT.
+_RECONNECT_DELAY_MIN = 1
+_RECONNECT_DELAY_MAX = 60
+# The number of devices to hold the commands for while LT is unreachable.
+_OFFLINE_COMMANDS_LIMIT = 100
+# The time (in seconds) for LT to respond to a request.
+_RESPONSE_TIMEOUT = 30
+# LT sends the `response` first, so it is looked for in the head of a frame.
+_GET_DEVICES = b'"get-devices"'
+_GET_DEVICES_LOOKAHEAD = 64
+
+
+class _HubLogger(logging.LoggerAdapter):
+    """
+    Tells the hubs apart in the log when there are several.
+    """
+
+    def process(self, msg: Any, kwargs: Any) -> tuple[Any, Any]:
+        return f"[{self.extra['prefix']}] {msg}", kwargs
+
 
 class LarnitechMqttBridge:
     def __init__(
         self,
         mqtt: Mqtt,
         larnitech: LarnitechConfig,
+        metrics: Metrics | None = None,
+        recorder: TrafficRecorder | None = None,
+        prefix: str = _PREFIX,
     ):
+        self.prefix = prefix
+        """
+        The first segment of the hub's topics, and the namespace of its
+        `unique_id` in HA.
+        """
+
         self._mqtt = mqtt
         self._larnitech = larnitech
+        self._logger = _LOGGER if prefix == _PREFIX else _HubLogger(_LOGGER, {"prefix": prefix})
+        self._metrics = metrics or Metrics()
+        self._recorder = recorder
         self._devices = LarnitechDeviceRegistry()
+        # The HA device per area, shared by the configs of its entities.
+        self._ha_devices: dict[str, dict] = {}
+        # The command topics with the device and the attribute they control.
+        self._routes: MqttTopicRouter[tuple[LarnitechDevice, str | None]] = MqttTopicRouter()
         self._ws: WsClientConnection | None = None
-        self._status_set_queue = ThreadSafeQueue[tuple[str, dict]]()
-        self._mqtt.client.on_message = self._notify_lt
+        self._responses: dict[str, deque[asyncio.Future[dict]]] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._command_priorities = dict(larnitech.command_priorities)
+        self._status_set_queue = LarnitechCommandQueue(
+            window=larnitech.command_window,
+            limit=_OFFLINE_COMMANDS_LIMIT,
+            rate=larnitech.command_rate,
+            burst=larnitech.command_burst,
+            priority=self._command_priority,
+            batch=larnitech.command_batch,
+        )
+        self._state_filters = dict(larnitech.state_filters)
+        self._state_filter = MqttPublishFilter(self._publish_state)
+        self._registered = False
+        self._reconnect_delay = _RECONNECT_DELAY_MIN
+        # The time each device got a command from HA, till LT confirms it.
+        self._commands_received: dict[str, float] = {}
+        self._metrics.command_queue_depth.track(lambda: len(self._status_set_queue), self.prefix)
+        self._metrics.commands_pending.track(lambda: len(self._commands_received), self.prefix)
+        self._acks = MqttAckTracker()
+        self._started_at = monotonic()
+        self._restored: asyncio.Task | None = None
+        # The time of each startup event since the start, till HA is primed.
+        self._timeline: dict[str, float] = {}
+        # The states being published on start, till they are sent.
+        self._inflight: MqttInflightWindow | None = None
+
+        self.primed = asyncio.Event()
+        """
+        Set once the initial states of all devices are sent: acknowledged by
+        the broker with QoS 1, or written to the socket with QoS 0.
+        """
 
-    def _register_device(self, device: LarnitechDevice) -> None:
+    def _register_device(self, device: LarnitechDevice) -> bool:
         """
         Register a Larnitech device based on its config.
+
+        :return: Whether the discovery config was (re)published.
         """
         addr_id = to_id(device.addr)
         area_id = to_id(device.area)
-        unique_id = f"{_PREFIX}_{addr_id}"
-        topic_prefix = f"{_PREFIX}/{addr_id}"
+        unique_id = f"{self.prefix}_{addr_id}"
+        topic_prefix = f"{self.prefix}/{addr_id}"
+        routes = {}
+        ha_device = self._ha_devices.get(area_id)
+
+        if ha_device is None:
+            # The areas of the first hub are identified as before there were several.
+            ha_area_id = area_id if self.prefix == _PREFIX else f"{self.prefix}_{area_id}"
+            ha_device = self._ha_devices[area_id] = {
+                "name": "Larnitech",
+                "model": "Metaforsa 3.plus",
+                "identifiers": [f"mf14_3plus_{ha_area_id}"],
+                "suggested_area": device.area,
+            }
 
         for key, value in device.config.items():
             if key.endswith("command_topic"):
                 assert isinstance(value, str), key
                 device.config[key] = build_topic(topic_prefix, value, "set")
-                # Auto-subscribe to the commands.
-                self._mqtt.client.subscribe(device.config[key])
+                routes[device.config[key]] = (device, value or None)
             elif key.endswith("_topic"):
                 assert isinstance(value, str), key
                 device.config[key] = build_topic(topic_prefix, value, "state")
@@ -58,174 +165,683 @@ class LarnitechMqttBridge:
             "area": device.area,
             "name": f"{device.area} {device.name}",
             "unique_id": unique_id,
-            "object_id": f"{_PREFIX}_{area_id}_{to_id(device.name)}",
-            "device": {
-                "name": "Larnitech",
-                "model": "Metaforsa 3.plus",
-                "identifiers": [f"mf14_3plus_{area_id}"],
-                "suggested_area": device.area,
-            },
+            "object_id": f"{self.prefix}_{area_id}_{to_id(device.name)}",
+            "device": ha_device,
         })
 
-        # Tell HA about the new device.
-        self._mqtt.client.publish(
-            f"{self._mqtt.discovery.prefix}/{device.entity_type}/{unique_id}/config",
-            device.config,
-            retain=True,
-        )
+        config_topic = self._config_topic(device)
+        changed = self._mqtt.discovered.changed(config_topic, device.config)
+
+        # Tell HA about the new device unless it's already known.
+        if changed:
+            info = self._mqtt.client.publish(config_topic, device.config, qos=1, retain=True)
+            self._acks.track(info.mid)
 
         # Store for further operations.
         self._devices.add(device)
+        self._routes.add(device.addr, routes)
+
+        return changed
+
+    def _unregister_device(self, device: LarnitechDevice) -> None:
+        """
+        Remove a Larnitech device from HA and stop handling its commands.
+        """
+        self._devices.remove(device.addr)
+        topics = self._routes.remove(device.addr)
+
+        if topics and self._mqtt.subscribe_mode != "wildcard":
+            self._mqtt.client.unsubscribe(list(topics))
+
+        # The entity is deleted in HA along with the other stale ones.
+        self._mqtt.discovered.forget(self._config_topic(device))
+
+        for key, topic in device.config.items():
+            if key.endswith("_topic") and not key.endswith("command_topic"):
+                self._mqtt.published.forget(topic)
+                self._mqtt.snapshot.forget(topic)
+                self._state_filter.forget(topic)
+
+    def _config_topic(self, device: LarnitechDevice) -> str:
+        return f"{self._mqtt.discovery.prefix}/{device.entity_type}/{self.prefix}_{to_id(device.addr)}/config"
+
+    def _subscribe_commands(self, devices: tuple[LarnitechDevice, ...]) -> None:
+        """
+        Subscribe to the command topics of the registered devices.
+        """
+        # The wildcards are subscribed to on connect, along with the HA status.
+        if self._mqtt.subscribe_mode == "wildcard":
+            return
+
+        topics = [
+            topic
+            for device in devices
+            for key, topic in device.config.items()
+            if key.endswith("command_topic")
+        ]
+
+        if self._mqtt.subscribe_mode == "batch":
+            if topics:
+                _, mid = self._mqtt.client.subscribe([(topic, 0) for topic in topics])
+                self._acks.track(mid)
+        else:
+            for topic in topics:
+                _, mid = self._mqtt.client.subscribe(topic)
+                self._acks.track(mid)
+
+    def _unregister_stale(self) -> int:
+        """
+        Remove the devices that are no longer in LT from HA. Until the
+        removal is confirmed, they are considered stale on the next sync.
+
+        :return: The number of removed devices.
+        """
+        stale = self._mqtt.discovered.stale()
+
+        for config_topic in stale:
+            # An empty retained payload deletes the entity in HA.
+            info = self._mqtt.client.publish(config_topic, "", qos=1, retain=True)
+            self._acks.track(info.mid)
+
+        return len(stale)
+
+    async def _confirm_discovery(self) -> bool:
+        """
+        Wait for the broker to acknowledge the discovery configs and the
+        subscriptions, and remember the configs as published if it does.
+        Otherwise (some were not even sent, i.e. while disconnected), they
+        are published again on the next sync.
+
+        :return: Whether it's confirmed in time.
+        """
+        if not await self._acks.wait(_REGISTRATION_TIMEOUT):
+            self._logger.warning("⚠️ MQTT: Registration is not confirmed, proceeding to retry on the next sync")
+            return False
+
+        self._mqtt.discovered.save()
+
+        return True
 
     def _notify_ha(self, device: LarnitechDevice) -> None:
-        for topic_key, payload in device.notify_ha().items():
+        started = perf_counter()
+        values = device.notify_ha()
+        self._metrics.device_notify.observe(perf_counter() - started, self.prefix, type(device).__name__, "ha")
+
+        filters = self._device_state_filters(device)
+
+        for topic_key, payload in values.items():
             assert topic_key.endswith("_topic") and not topic_key.endswith("command_topic")
-            self._mqtt.client.publish(device.config[topic_key], payload)
+            topic = device.config[topic_key]
 
-    def _notify_lt(self, message: MQTTMessage) -> None:
-        if self._ws and message.topic.startswith(f"{_PREFIX}/") and message.topic.endswith("/set"):
-            # Drop `_PREFIX` from the start and `set` from the end.
-            path = message.topic.split("/")[1:-1]
-            addr = path.pop(0).replace("_", ":")
+            if topic_key not in filters:
+                self._publish_state(topic, payload)
+            elif not self._state_filter.offer(topic, payload, filters[topic_key]):
+                self._metrics.ha_publishes.inc(self.prefix, "filtered")
+
+    def _publish_state(self, topic: str, payload: Any, force: bool = False) -> None:
+        """
+        Publish the state unless HA already knows it.
+
+        :param force: Whether to publish even if unchanged.
+        """
+        if force:
+            self._mqtt.published.forget(topic)
+
+        if self._mqtt.published.changed(topic, payload):
+            info = self._mqtt.client.publish(topic, payload, qos=self._mqtt.state_qos)
+
+            # Not sent (i.e. while disconnected), so it's still to be published.
+            if info.rc != MQTTErrorCode.MQTT_ERR_SUCCESS:
+                self._mqtt.published.forget(topic)
+                self._metrics.ha_publishes.inc(self.prefix, "failed")
+                return
+
+            if self._inflight is not None:
+                self._inflight.track(info.mid)
+
+            self._mqtt.snapshot.record(topic, payload)
+            self._metrics.ha_publishes.inc(self.prefix, "published")
+        else:
+            self._metrics.ha_publishes.inc(self.prefix, "unchanged")
+
+    def _device_state_filters(self, device: LarnitechDevice) -> dict[str, LarnitechStateFilter]:
+        """
+        Get the filters of the device's states, per key of `notify_ha()`.
+        """
+        if self._state_filters:
+            for target in (*self._lt_addrs((device,)), device.type):
+                if target in self._state_filters:
+                    return dict.fromkeys(device.state_filter_keys, self._state_filters[target])
+
+        return {}
+
+    def _notify_ha_all(self) -> None:
+        for device in self._devices:
+            self._notify_ha(device)
+
+    def _renotify_ha(self, addrs: tuple[str, ...]) -> None:
+        for addr in addrs:
+            # The device may be removed or replaced by a sync since.
             device = self._devices.get(addr)
 
-            if device:
-                # noinspection PyUnresolvedReferences
-                status = device.notify_lt(
-                    path.pop(0) if path else None,
-                    message.payload.decode(),
-                )
+            if device is None:
+                continue
+
+            for topic_key in device.notify_ha():
+                self._mqtt.published.forget(device.config[topic_key])
+                self._state_filter.forget(device.config[topic_key])
+
+            self._notify_ha(device)
+
+    def subscriptions(self) -> list[str]:
+        """
+        The topics to subscribe to when connected to the broker, in addition to
+        the ones of the devices.
+        """
+        # The commands for all devices are routed in-process.
+        if self._mqtt.subscribe_mode == "wildcard":
+            return [
+                build_topic(self.prefix, "+", "set"),
+                build_topic(self.prefix, "+/+", "set"),
+            ]
+
+        return []
+
+    def on_mqtt_connect(self) -> None:
+        """
+        Subscribe to the command topics of the devices and, on a reconnect,
+        resend the states the broker might have missed meanwhile.
+        """
+        self._subscribe_commands(tuple(self._devices))
+
+        if self._registered:
+            self._logger.info("✅ MQTT: Reconnected, republishing the states")
+            self._mqtt.published.clear()
+            self._state_filter.clear()
+            self._notify_ha_all()
+
+    def on_mqtt_ack(self, mid: int) -> None:
+        self._acks.ack(mid)
+
+        if self._inflight is not None:
+            self._inflight.ack(mid)
+
+    def on_mqtt_message(self, message: MQTTMessage) -> None:
+        if message.topic == self._mqtt.discovery.status_topic:
+            self._on_ha_status(message)
+        else:
+            self._notify_lt(message)
+
+    def _on_ha_status(self, message: MQTTMessage) -> None:
+        # HA forgets the states on restart and announces itself
+        # when it's back. Resend everything it might have missed.
+        if self._registered and message.payload.decode() == self._mqtt.discovery.payload_online:
+            self._logger.info("✅ HA: Online, republishing the discovery configs and the states")
+
+            # The broker may have lost the retained configs as well,
+            # i.e. when reinstalled or running without persistence.
+            for device in self._devices:
+                self._mqtt.client.publish(self._config_topic(device), device.config, qos=1, retain=True)
+
+            self._mqtt.published.clear()
+            self._state_filter.clear()
+            self._notify_ha_all()
+
+            # Repeat the states for the entities HA creates anew, if any.
+            self._loop.call_later(_DISCOVERY_SETTLE_TIME, self._renotify_ha, tuple(device.addr for device in self._devices))
+
+    def _notify_lt(self, message: MQTTMessage) -> None:
+        if self._recorder:
+            self._recorder.record(TrafficRecorder.MQTT_IN, (message.topic, message.payload))
+
+        # The commands are queued even when LT is unreachable at
+        # the moment, and delivered once it's connected back.
+        if self._registered:
+            route = self._routes.get(message.topic)
+
+            if route is None:
+                self._metrics.ha_unknown_topics.inc(self.prefix)
+            else:
+                device, attr = route
+                received = perf_counter()
+                status = device.notify_lt(attr, message.payload.decode())
+                self._metrics.device_notify.observe(perf_counter() - received, self.prefix, type(device).__name__, "lt")
 
                 # Make a list of updates.
                 if isinstance(status, dict):
-                    status = ((addr, status),)
+                    status = ((device.addr, status),)
+
+                self._queue_status_set(status, received)
+
+    def _queue_status_set(self, status: tuple[tuple[str, dict], ...], received: float | None = None) -> None:
+        if received is not None:
+            self._metrics.ha_commands.inc(self.prefix)
+
+            for _addr, _ in status:
+                # Coalesced commands are measured from the first one.
+                self._commands_received.setdefault(_addr, received)
+
+        self._drop_commands(self._status_set_queue.put(status))
 
-                # Queue updates.
-                for _addr, _status in status:
-                    self._status_set_queue.put((_addr, _status))
+    def _drop_commands(self, addrs: tuple[str, ...]) -> None:
+        for _addr in addrs:
+            self._commands_received.pop(_addr, None)
+            self._logger.warning(f"⚠️ LT: Too many pending commands, dropped the one for {_addr}")
+
+    def _command_priority(self, addr: str) -> int:
+        """
+        Get the priority of the commands for the device. The devices combined
+        in HA share it, to keep the order of their commands.
+        """
+        device = self._devices.get(addr)
+
+        if device is None:
+            return 0
+
+        for _addr in self._lt_addrs((device,)):
+            if _addr in self._command_priorities:
+                return self._command_priorities[_addr]
+
+        return device.command_priority
 
     async def _process_status_set_queue(self):
         while True:
-            await asyncio.sleep(0.01)
+            _addrs, _status = await self._status_set_queue.get()
+            now = perf_counter()
+            priority = str(self._command_priority(_addrs[0]))
 
-            while not self._status_set_queue.empty():
-                _addr, _status = self._status_set_queue.get_nowait()
+            for _addr in _addrs:
+                received = self._commands_received.get(_addr)
 
-                await self._ws_send(
+                if received is not None:
+                    self._metrics.command_queue_delay.observe(now - received, self.prefix, priority)
+
+            try:
+                # Do not wait for the response to send the next batch.
+                response = await self._ws_send(
                     request="status-set",
                     status=_status,
-                    addr=_addr,
+                    # Keep the single `addr` as is; a list sets them all.
+                    addr=_addrs[0] if len(_addrs) == 1 else _addrs,
                 )
+                response.add_done_callback(self._lt_on_status_set_response)
+            except ConnectionClosed:
+                # Hold it until the connection is back, without overriding
+                # the commands that came meanwhile.
+                self._drop_commands(self._status_set_queue.requeue((_addr, _status) for _addr in _addrs))
+                return
 
     async def run(self):
-        self._mqtt.client.loop_start()
+        self._loop = asyncio.get_running_loop()
+        self._started_at = monotonic()
+        # Along with connecting to LT, to be done by the time the devices are.
+        self._restored = asyncio.create_task(self._restore_states())
 
+        try:
+            # Keep the MQTT session and the devices while reconnecting to LT.
+            while True:
+                try:
+                    await self._run_session()
+                except (ConnectionClosed, InvalidHandshake, OSError) as e:
+                    self._metrics.lt_reconnects.inc(self.prefix)
+                    self._logger.warning(f"⚠️ LT: Connection lost ({e!r}), reconnecting in {self._reconnect_delay}s")
+                except Exception as e:
+                    # A bug or an unexpected response must not leave the hub
+                    # unserved, start over as with a lost connection.
+                    self._metrics.lt_reconnects.inc(self.prefix)
+                    self._logger.exception(f"😰 LT: Session failed ({e!r}), reconnecting in {self._reconnect_delay}s")
+
+                await asyncio.sleep(self._reconnect_delay)
+                self._reconnect_delay = min(self._reconnect_delay * 2, _RECONNECT_DELAY_MAX)
+        finally:
+            self._restored.cancel()
+            self._mqtt.snapshot.close()
+
+            if self._recorder:
+                self._recorder.close()
+
+    async def _restore_states(self) -> None:
+        """
+        Publish the states from the previous run, so HA has them until LT is
+        connected. Once it is, only the states that differ are published.
+        """
+        states = self._mqtt.snapshot.load()
+        await self._mqtt.client.connected.wait()
+        self._mark("mqtt connected")
+
+        for topic, payload in states.items():
+            info = self._mqtt.client.publish(topic, payload, qos=self._mqtt.state_qos)
+
+            if info.rc == MQTTErrorCode.MQTT_ERR_SUCCESS:
+                self._mqtt.published.changed(topic, payload)
+
+        if states:
+            self._logger.info(f"✅ HA: {len(states)} states restored from the snapshot")
+
+    async def _run_session(self):
+        reader_task: asyncio.Task | None = None
         status_set_task: asyncio.Task | None = None
+        sync_task: asyncio.Task | None = None
+        keepalive_task: asyncio.Task | None = None
 
         try:
             async with self._larnitech.connect() as self._ws:
+                # The requests left from the previous session are expired by
+                # their timers, their responses are not coming here.
+                self._responses = {}
+                self._mark("lt connected")
+                # All frames are read in one place, the responses are
+                # handed over to the requests awaiting them.
+                reader_task = asyncio.create_task(self._ws_read())
+
+                # From the start, the hub may stop responding at any point.
+                if self._larnitech.ping_interval > 0:
+                    keepalive_task = asyncio.create_task(self._keepalive())
+
                 await self._ws_send(
                     request="authorize",
                     handler=self._lt_on_auth,
                     key=self._larnitech.key,
                 )
+                # Subscribes to the statuses as well.
                 await self._ws_send(
                     request="get-devices",
                     handler=self._lt_on_get_devices,
                     status="detailed",
                 )
-                await self._ws_send(
-                    request="status-subscribe",
-                    handler=self._lt_on_status_subscribe,
-                    addr=tuple([
-                        addr
-                        for children
-                        in [
-                            device.children
-                            if isinstance(device, LarnitechDeviceWrapper)
-                            else (device.addr,)
-                            for device
-                            in self._devices
-                        ]
-                        for addr
-                        in children
-                    ]),
-                )
 
-                # Deliver status updates to LT in a separate thread.
+                # The session is up, start over if it's lost.
+                self._reconnect_delay = _RECONNECT_DELAY_MIN
+
+                # Deliver status updates to LT in a separate task.
+                self._status_set_queue.release()
                 status_set_task = asyncio.create_task(self._process_status_set_queue())
 
-                while True:
-                    message = await self._ws_receive()
+                if self._larnitech.sync_interval > 0:
+                    sync_task = asyncio.create_task(self._sync_periodically())
 
-                    if message.get("response") == "status-set":
-                        self._lt_on_status_set(**message)
-                    elif message.get("event") == "statuses":
-                        self._lt_on_status_update(**message)
-                    else:
-                        _LOGGER.warning(f"⚠️ Unexpected message {message}")
+                # Runs until the connection is lost.
+                await reader_task
         finally:
-            if status_set_task:
-                status_set_task.cancel()
+            self._ws = None
+            self._drop_commands(self._status_set_queue.hold())
 
-            self._mqtt.client.disconnect()
-            self._mqtt.client.loop_stop()
+            tasks = tuple(task for task in (reader_task, status_set_task, sync_task, keepalive_task) if task)
 
-    def run_sync(self):
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        bridge = loop.create_task(self.run())
+            for task in tasks:
+                task.cancel()
 
-        try:
-            loop.run_forever()
-        except KeyboardInterrupt:
-            bridge.cancel()
-            _LOGGER.info("Bye 👋🏻")
+            # Collect the outcomes so that none is reported as never retrieved.
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-    @staticmethod
-    async def _lt_on_auth(result: str, **_: dict) -> None:
+    async def _lt_on_auth(self, result: str, **_: dict) -> None:
         if result == "success":
-            _LOGGER.info("✅ LT: Authorized")
+            self._mark("authorized")
+            self._logger.info("✅ LT: Authorized")
         else:
-            _LOGGER.error("🚫 LT: Auth failed")
+            self._logger.error("🚫 LT: Auth failed")
             raise RuntimeError()
 
     async def _lt_on_get_devices(
         self,
-        devices: list[dict],
-        found: int,
+        devices: Iterable[dict],
         **_: dict,
     ) -> None:
+        if self._registered:
+            await self._lt_sync(devices)
+            # The session is new, subscribe to all.
+            await self._ws_send(
+                request="status-subscribe",
+                handler=self._lt_on_status_subscribe,
+                addr=self._lt_addrs(tuple(self._devices)),
+            )
+            return
+
         to_register, to_ignore = group(
             items=devices,
             client=self._larnitech,
         )
+        addr = self._lt_addrs(to_register)
+        self._mark("devices received")
 
-        for device in to_register:
-            self._register_device(device)
+        # The states from the snapshot must not follow the ones from LT.
+        await self._restored
+
+        self._acks.start()
+        published = tuple(device for device in to_register if self._register_device(device))
+        removed = self._unregister_stale()
+        self._subscribe_commands(to_register)
+        self._mark("discovery published")
+
+        # The devices are registered to take the statuses, and the broker
+        # confirms the discovery while LT is preparing the response.
+        subscribed = await self._ws_send(
+            request="status-subscribe",
+            addr=addr,
+        )
 
         for item in to_ignore:
-            _LOGGER.info(f"🚫 LT: Ignoring {item}")
+            self._logger.info(f"🚫 LT: Ignoring {item}")
+
+        self._logger.info(
+            (
+                f"✅ HA: {len(published)} discovery configs published, "
+                f"{len(to_register) - len(published)} unchanged, "
+                f"{removed} removed"
+            ),
+        )
+
+        # Ensure the broker got the discovery configs and
+        # the subscriptions before sending the states.
+        await self._confirm_discovery()
 
-        # Give the devices time to register.
-        await asyncio.sleep(3)
+        self._mark("discovery confirmed")
+        await self._lt_on_status_subscribe(**await subscribed, addr=addr)
+        self._mark("subscribed")
 
         # Set the initial state.
-        for device in self._devices:
-            self._notify_ha(device)
+        states, confirmed = await self._prime_ha()
+        first_state = self._mark("first state")
+        primed = self._mark("ha primed")
+        self._registered = True
+        self.primed.set()
+
+        # The broker has the configs but HA may still be creating the
+        # entities, missing the states above. Repeat for the new ones.
+        if published:
+            self._loop.call_later(_DISCOVERY_SETTLE_TIME, self._renotify_ha, tuple(device.addr for device in published))
 
         # Some devices in HA may absorb several devices from LT so
         # the sum of ignored and registered might not match the total.
-        _LOGGER.info(
+        # The `found` isn't used as it may follow the lazily decoded list.
+        self._logger.info(
             (
-                f"✅ LT: {found} devices: "
+                f"✅ LT: {len(to_ignore) + len(self._lt_addrs(to_register))} devices: "
                 f"{len(to_ignore)} ignored, "
-                f"{len(self._devices)} registered"
+                f"{len(self._devices)} registered, "
+                f"first state in {first_state:.2f}s"
+            ),
+        )
+        # With QoS 0, there is nothing from the broker to tell it has them.
+        sent = "acknowledged by the broker" if self._mqtt.state_qos else "written"
+        self._logger.info(
+            (
+                f"✅ HA: Primed with {states} states {sent} in {primed - first_state:.2f}s"
+                if confirmed else
+                f"⚠️ HA: Primed with {states} states in {primed - first_state:.2f}s, not all {sent}"
             ),
         )
+        self._logger.info(
+            "✅ Startup: " + ", ".join(f"{event} at {elapsed:.2f}s" for event, elapsed in self._timeline.items()),
+        )
+
+    async def _prime_ha(self) -> tuple[int, bool]:
+        """
+        Publish the states of all devices, with at most as many of them as
+        the client's inflight messages (give or take the states of a device)
+        not yet acknowledged with QoS 1, or written to the socket with QoS 0,
+        so the whole install goes out at the pace the broker takes it.
+
+        :return: The number of states published and whether all of them
+          were acknowledged or written.
+        """
+        window = self._inflight = MqttInflightWindow(self._mqtt.client.max_inflight_messages)
+        confirmed = True
+
+        try:
+            for device in tuple(self._devices):
+                if not await window.acquire(_PRIME_STALL_TIMEOUT):
+                    confirmed = False
+                    self._logger.warning(f"⚠️ MQTT: No states sent in {_PRIME_STALL_TIMEOUT}s, proceeding")
+
+                self._notify_ha(device)
+                self._mark("first state")
+
+            confirmed = await window.wait(_REGISTRATION_TIMEOUT) and confirmed
+        finally:
+            self._inflight = None
+
+        self._mark("ha primed")
+
+        return window.tracked, confirmed
+
+    def _mark(self, event: str) -> float:
+        """
+        Note the time of the startup `event`, unless the startup is over.
+
+        :return: The time of the event since the start.
+        """
+        elapsed = monotonic() - self._started_at
+
+        if self._registered:
+            return elapsed
+
+        # The first time counts, i.e. if LT reconnects during the startup.
+        return self._timeline.setdefault(event, elapsed)
+
+    async def _lt_sync(self, devices: Iterable[dict]) -> tuple[str, ...]:
+        """
+        Catch up with the changes in LT: the devices added, changed or removed
+        and their statuses.
+
+        :return: The `addr` of the added devices, to subscribe to.
+        """
+        to_register, _ = group(
+            items=devices,
+            client=self._larnitech,
+        )
+
+        latest = {device.addr: device for device in to_register}
+        removed = tuple(device for device in self._devices if device.addr not in latest)
+        added = tuple(device for device in to_register if device.addr not in self._devices)
+        added_addrs = {device.addr for device in added}
+        self._acks.start()
+
+        # The configs under the former entity type are deleted in HA along
+        # with the stale ones, or HA gets both.
+        for device in to_register:
+            previous = self._devices.get(device.addr)
+
+            if previous and previous.entity_type != device.entity_type:
+                self._mqtt.discovered.forget(self._config_topic(previous))
+
+        # Before registering, as the removed wrappers may hold the aliases
+        # for the devices that are now registered on their own.
+        for device in removed:
+            self._unregister_device(device)
+
+        # The models are replaced with the latest ones; their discovery
+        # configs are only published to HA if they changed.
+        published = tuple(device for device in to_register if self._register_device(device))
+        changed = sum(1 for device in published if device.addr not in added_addrs)
+        self._unregister_stale()
+        self._subscribe_commands(published)
+        await self._confirm_discovery()
+
+        # Only the values that differ from the
+        # last published ones are sent to HA.
+        self._notify_ha_all()
+
+        if published:
+            self._loop.call_later(_DISCOVERY_SETTLE_TIME, self._renotify_ha, tuple(device.addr for device in published))
+
+        if added or changed or removed:
+            self._logger.info(f"✅ LT: Devices synced: {len(added)} added, {changed} changed, {len(removed)} removed")
+
+        return self._lt_addrs(added)
+
+    async def _keepalive(self) -> None:
+        """
+        Ping LT and measure the round trip. If there is no reply within the
+        `ping_timeout` (i.e. the TCP connection is half-open), drop the
+        connection so the session starts over.
+        """
+        ws = self._ws
+
+        while True:
+            await asyncio.sleep(self._larnitech.ping_interval)
+
+            try:
+                # Sending may hang as well, when nothing gets through.
+                async with asyncio.timeout(self._larnitech.ping_timeout):
+                    rtt = await (await ws.ping())
+            except TimeoutError:
+                # The session is closing, the pong may be skipped.
+                if ws.state is not State.OPEN:
+                    return
+
+                self._logger.warning(f"⚠️ LT: No reply to the ping in {self._larnitech.ping_timeout}s, reconnecting")
+                # The reader gets `ConnectionClosed` right away, without
+                # the closing handshake the hub won't respond to either.
+                ws.transport.abort()
+                return
+
+            self._metrics.lt_rtt.observe(rtt, self.prefix)
+
+    async def _sync_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._larnitech.sync_interval)
+
+            try:
+                response = await self._ws_send(
+                    request="get-devices",
+                    status="detailed",
+                )
+                addr = await self._lt_sync((await response)["devices"])
+
+                # Only the new devices, the session is subscribed to the rest.
+                if addr:
+                    await self._ws_send(
+                        request="status-subscribe",
+                        handler=self._lt_on_status_subscribe,
+                        addr=addr,
+                    )
+            except ConnectionClosed:
+                # The session is over, the next one syncs on start.
+                return
+            except Exception as e:
+                # The next sync covers everything this one missed.
+                self._logger.exception(
+                    f"😰 LT: Device sync failed ({e!r}), retrying in {self._larnitech.sync_interval}s",
+                )
 
     @staticmethod
+    def _lt_addrs(devices: tuple[LarnitechDevice, ...]) -> tuple[str, ...]:
+        """
+        Get the `addr` of the devices in LT, including the wrapped ones.
+        """
+        return tuple(
+            addr
+            for device in devices
+            for addr in (
+                device.children
+                if isinstance(device, LarnitechDeviceWrapper)
+                else (device.addr,)
+            )
+        )
+
     async def _lt_on_status_subscribe(
+        self,
         found: int,
         subscribed: int,
         devices: list[dict],
@@ -237,32 +853,47 @@ class LarnitechMqttBridge:
         assert size == found
         assert size == subscribed
         if found == subscribed:
-            _LOGGER.info(f"✅ LT: Subscribed to {size} devices.")
+            self._logger.info(f"✅ LT: Subscribed to {size} devices.")
         else:
-            _LOGGER.error(f"😰 LT: Subscribed to {subscribed} out of {size} devices.")
+            self._logger.error(f"😰 LT: Subscribed to {subscribed} out of {size} devices.")
             raise RuntimeError()
 
     def _lt_on_status_set(self, devices: list[dict], **_: dict) -> None:
+        now = perf_counter()
+
         for item in devices:
             device = self._devices.get(item["addr"])
+            received = self._commands_received.pop(item["addr"], None)
+
+            if received is not None:
+                self._metrics.command_latency.observe(now - received, self.prefix)
 
             if item["success"]:
-                _LOGGER.debug(f"✅ LT: Status changed for {device.name} in {device.area}.")
+                self._logger.debug(f"✅ LT: Status changed for {device.name} in {device.area}.")
             else:
-                _LOGGER.error(
+                self._logger.error(
                     (
                         "😰 LT: Failed to change status for "
                         f"{device.name} in {device.area}. {item}"
                     ),
                 )
 
+    def _lt_on_status_set_response(self, response: asyncio.Future[dict]) -> None:
+        if response.cancelled():
+            return
+
+        if response.exception():
+            self._logger.error(f"😰 LT: Failed to change status. {response.exception()!r}")
+        else:
+            self._lt_on_status_set(**response.result())
+
     def _lt_on_status_update(self, devices: list[dict], **_: dict) -> None:
         for item in devices:
             device = self._devices.get(item["addr"])
 
             if device:
                 device.set_status(item["status"], item["addr"])
-                # _LOGGER.debug(
+                # self._logger.debug(
                 #     (
                 #         f"⬅️ LT: Received {device.status} "
                 #         f"({device.area} / {device.name})"
@@ -270,37 +901,243 @@ class LarnitechMqttBridge:
                 # )
                 self._notify_ha(device)
 
+    async def _ws_read(self) -> None:
+        try:
+            while True:
+                message = await self._ws_receive()
+                response = message.get("response")
+                self._metrics.lt_frames.inc(self.prefix, response or message.get("event") or "unknown")
+
+                if response:
+                    self._ws_resolve(response, message)
+                elif message.get("event") == "statuses":
+                    self._lt_on_status_update(**message)
+                else:
+                    self._logger.warning(f"⚠️ Unexpected message {message}")
+        except Exception as e:
+            # Nothing is coming for the requests in flight.
+            for futures in self._responses.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+
+            raise
+        finally:
+            self._responses.clear()
+
+    def _ws_resolve(self, request: str, message: dict) -> None:
+        futures = self._responses.get(request)
+
+        if not futures:
+            self._logger.warning(f"⚠️ LT: Unexpected response {message}")
+            return
+
+        # LT responds in the order of requests. The future may
+        # already be done if the response came after the timeout.
+        future = futures.popleft()
+
+        if future.done():
+            self._logger.warning(f"⚠️ LT: Late response {message}")
+        else:
+            future.set_result(message)
+
+    def _ws_expire(self, request: str, future: asyncio.Future[dict], ws: WsClientConnection) -> None:
+        if future.done():
+            return
+
+        future.set_exception(TimeoutError(f"No response to {request} in {_RESPONSE_TIMEOUT}s"))
+
+        # The link is probably dead, and the responses to the other requests
+        # would mismatch if this one never comes. Start a new session, unless
+        # it's started already.
+        self._loop.create_task(ws.close())
+
     async def _ws_receive(self) -> dict:
         frame = await self._ws.recv(decode=False)
 
-        return json_loads(
-            frame.decode("utf-8", errors="ignore")
-            if isinstance(frame, bytes)
-            else frame,
-            strict=False,
-        )
+        if self._recorder:
+            self._recorder.record(TrafficRecorder.LT_IN, frame)
+
+        started = perf_counter()
+
+        # The device list is the largest frame by far, and a model is made of
+        # each item as it's decoded to never have the whole list in memory.
+        if _GET_DEVICES in frame[:_GET_DEVICES_LOOKAHEAD]:
+            message = json_loads_lazy(frame, "devices")
+
+            # It can't be dispatched without the `response`; decode it whole
+            # if that follows the list.
+            if "response" not in message and "devices" in message:
+                message["devices"] = list(message["devices"])
+        else:
+            message = json_loads(frame)
+
+        self._metrics.lt_decode.observe(perf_counter() - started, self.prefix)
+
+        return message
 
     async def _ws_send(
         self,
         request: str,
         handler: Callable | None = None,
         **kwargs: Any,
-    ) -> None:
+    ) -> asyncio.Future[dict]:
+        """
+        Send the request to LT.
+
+        :return: The future for the response. When the `handler` is given,
+         the response is awaited and passed to it.
+        """
         message = {"request": request, **kwargs}
         device = self._devices.get(kwargs.get("addr", ""))
 
         if device:
             assert isinstance(device, LarnitechDevice)
-            _LOGGER.debug(f"➡️ LT: Sending {message} ({device.area} / {device.name})")
+            self._logger.debug(f"➡️ LT: Sending {message} ({device.area} / {device.name})")
         else:
-            _LOGGER.debug(f"➡️ LT: Sending {message}")
+            self._logger.debug(f"➡️ LT: Sending {message}")
+
+        # Expect the response before sending the request, so it can't be missed.
+        ws = self._ws
+        response = self._loop.create_future()
+        timer = self._loop.call_later(_RESPONSE_TIMEOUT, self._ws_expire, request, response, ws)
+        response.add_done_callback(lambda _: timer.cancel())
+        futures = self._responses.setdefault(request, deque())
+        futures.append(response)
+
+        frame = json_dumps(message)
+
+        if self._recorder:
+            self._recorder.record(TrafficRecorder.LT_OUT, frame)
+
+        try:
+            await ws.send(frame, text=True)
+        except BaseException:
+            # Nothing is coming for the request that was not sent.
+            if response in futures:
+                futures.remove(response)
 
-        await self._ws.send(json_dumps(message))
+            response.cancel()
+            raise
 
         if handler:
-            response = await self._ws_receive()
-            assert response["response"] == request
-            await handler(**response, **kwargs)
+            await handler(**await response, **kwargs)
+
+        return response
+
+
+class LarnitechMqttBridgeGroup:
+    """
+    Runs the bridges of several hubs on one event loop, sharing the MQTT
+    connection. The hubs are independent: one being slow, unreachable or
+    failed does not hold the others.
+    """
+
+    def __init__(
+        self,
+        mqtt: Mqtt,
+        bridges: list[LarnitechMqttBridge],
+        metrics: Metrics | None = None,
+    ):
+        self._mqtt = mqtt
+        self._bridges = {bridge.prefix: bridge for bridge in bridges}
+        self._metrics = metrics or Metrics()
+        assert len(self._bridges) == len(bridges), "The hubs must have distinct prefixes"
+        self._mqtt.client.on_connect = self._on_mqtt_connect
+        self._mqtt.client.on_message = self._on_mqtt_message
+        self._mqtt.client.on_subscribe = self._on_mqtt_ack
+        self._mqtt.client.on_publish = self._on_mqtt_ack
+
+    def _on_mqtt_connect(self) -> None:
+        # Nothing is subscribed to at the start of a clean session.
+        self._mqtt.client.subscribe([
+            (topic, 0)
+            for topic in (
+                self._mqtt.discovery.status_topic,
+                *(topic for bridge in self._bridges.values() for topic in bridge.subscriptions()),
+            )
+        ])
+
+        for bridge in self._bridges.values():
+            bridge.on_mqtt_connect()
+
+    def _on_mqtt_message(self, message: MQTTMessage) -> None:
+        if message.topic == self._mqtt.discovery.status_topic:
+            for bridge in self._bridges.values():
+                bridge.on_mqtt_message(message)
+        else:
+            bridge = self._bridges.get(message.topic.partition("/")[0])
+
+            if bridge:
+                bridge.on_mqtt_message(message)
+            else:
+                # No hub to attribute it to.
+                self._metrics.ha_unknown_topics.inc("")
+
+    def _on_mqtt_ack(self, mid: int) -> None:
+        # Only the bridge that awaits the `mid` takes it into account.
+        for bridge in self._bridges.values():
+            bridge.on_mqtt_ack(mid)
+
+    async def primed(self) -> None:
+        """
+        Wait for the initial states of all hubs to be sent (see `primed` of
+        the bridges).
+        """
+        await asyncio.gather(*(bridge.primed.wait() for bridge in self._bridges.values()))
+
+    async def run(self):
+        # The MQTT client runs on this loop too, with no threads involved.
+        # It connects along with the bridges connecting to their hubs.
+        client = asyncio.create_task(self._mqtt.client.run())
+
+        try:
+            # Returns once every hub has stopped.
+            await asyncio.gather(*(self._run_bridge(bridge) for bridge in self._bridges.values()))
+        finally:
+            client.cancel()
+            await asyncio.gather(client, return_exceptions=True)
+
+    @staticmethod
+    async def _run_bridge(bridge: LarnitechMqttBridge):
+        try:
+            await bridge.run()
+        except Exception as e:
+            # Keep serving the other hubs.
+            _LOGGER.exception(f"😰 LT: The {bridge.prefix} hub stopped ({e!r})")
+
+    def run_sync(self, metrics_server: MetricsServer | None = None):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+        if metrics_server:
+            loop.run_until_complete(metrics_server.start())
+
+        bridges = loop.create_task(self.run())
+        # Don't stay alive with no hub being served.
+        bridges.add_done_callback(lambda _: loop.stop())
+
+        try:
+            loop.run_forever()
+        except KeyboardInterrupt:
+            bridges.cancel()
+            _LOGGER.info("Bye 👋🏻")
+            return
+
+        _LOGGER.critical("🚫 LT: No hub is running, exiting")
+        raise SystemExit(1)
+
+
+def _hub_path(path: str | None, prefix: str) -> str | None:
+    """
+    The per-hub file, the first hub uses the `path` as is.
+    """
+    if path is None or prefix == _PREFIX:
+        return path
+
+    root, ext = os.path.splitext(path)
+
+    return f"{root}.{prefix}{ext}"
 
 
 def main() -> None:
@@ -342,6 +1179,45 @@ def main() -> None:
         required=True,
         choices=["tcp", "websockets", "unix"],
     )
+    parser.add_argument(
+        "--mqtt-publish-max-age",
+        type=float,
+        default=0,
+        metavar="SECONDS",
+    )
+    parser.add_argument(
+        "--mqtt-discovery-cache",
+        default=None,
+        metavar="PATH",
+    )
+    parser.add_argument(
+        "--mqtt-state-snapshot",
+        default=None,
+        metavar="PATH",
+    )
+    parser.add_argument(
+        "--mqtt-state-snapshot-max-age",
+        type=float,
+        default=3600,
+        metavar="SECONDS",
+    )
+    parser.add_argument(
+        "--mqtt-subscribe-mode",
+        default="wildcard",
+        choices=get_args(MqttSubscribeMode),
+    )
+    parser.add_argument(
+        "--mqtt-state-qos",
+        type=int,
+        default=0,
+        choices=(0, 1),
+    )
+    parser.add_argument(
+        "--mqtt-inflight",
+        type=int,
+        default=100,
+        metavar="MESSAGES",
+    )
     parser.add_argument(
         "--lt-host",
         required=True,
@@ -355,6 +1231,15 @@ def main() -> None:
         "--lt-key",
         required=True,
     )
+    parser.add_argument(
+        "--lt-hub",
+        default=[],
+        action="append",
+        nargs=4,
+        metavar=("PREFIX", "HOST", "PORT", "KEY"),
+        dest="hubs",
+        help=f"Another hub to serve, its topics and entities start with the PREFIX instead of `{_PREFIX}`.",
+    )
     parser.add_argument(
         "--lt-ignore-addr",
         default=[],
@@ -376,34 +1261,173 @@ def main() -> None:
         nargs="+",
         dest="ignored_areas",
     )
+    parser.add_argument(
+        "--lt-command-window",
+        type=float,
+        default=0.02,
+        metavar="SECONDS",
+    )
+    parser.add_argument(
+        "--lt-command-batch",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--lt-command-rate",
+        type=float,
+        default=0,
+        metavar="REQUESTS",
+    )
+    parser.add_argument(
+        "--lt-command-burst",
+        type=int,
+        default=10,
+        metavar="REQUESTS",
+    )
+    parser.add_argument(
+        "--lt-command-priority",
+        action="append",
+        nargs=2,
+        default=[],
+        metavar=("ADDR", "PRIORITY"),
+        dest="command_priorities",
+    )
+    parser.add_argument(
+        "--lt-state-filter",
+        action="append",
+        nargs=2,
+        default=[],
+        metavar=("TARGET", "FILTER"),
+        dest="state_filters",
+    )
+    parser.add_argument(
+        "--lt-sync-interval",
+        type=float,
+        default=300,
+        metavar="SECONDS",
+    )
+    parser.add_argument(
+        "--lt-ping-interval",
+        type=float,
+        default=10,
+        metavar="SECONDS",
+    )
+    parser.add_argument(
+        "--lt-ping-timeout",
+        type=float,
+        default=5,
+        metavar="SECONDS",
+    )
+
+    parser.add_argument(
+        "--record",
+        default=None,
+        metavar="PATH",
+    )
+    parser.add_argument(
+        "--metrics-host",
+        default="127.0.0.1",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=0,
+    )
 
     args = parser.parse_args()
-    bridge = LarnitechMqttBridge(
-        mqtt=Mqtt(
-            client=MqttClient(
-                client_id=args.mqtt_client_id,
-                host=args.mqtt_host,
-                port=args.mqtt_port,
-                username=args.mqtt_username,
-                password=args.mqtt_password,
-                protocol=MQTTProtocolVersion(args.mqtt_proto),
-                transport=args.mqtt_transport,
-            ),
-            discovery=MqttDiscovery(
-                prefix=args.ha_mqtt_discovery_prefix,
-            ),
+    hubs = [(_PREFIX, args.lt_host, args.lt_port, args.lt_key)]
+
+    for prefix, host, port, key in args.hubs:
+        if not fullmatch(r"[a-z0-9_]+", prefix) or prefix in (hub[0] for hub in hubs):
+            parser.error(f"--lt-hub: the {prefix!r} prefix must be unique, of lowercase letters, digits and underscores")
+
+        if not port.isdigit():
+            parser.error(f"--lt-hub: the {port!r} port must be a number")
+
+        hubs.append((prefix, host, int(port), key))
+
+    command_priorities = []
+
+    for addr, priority in args.command_priorities:
+        if not fullmatch(r"-?[0-9]+", priority):
+            parser.error(f"--lt-command-priority: the {priority!r} priority must be a number")
+
+        command_priorities.append((addr, int(priority)))
+
+    state_filters = []
+
+    for target, spec in args.state_filters:
+        try:
+            state_filters.append((target, LarnitechStateFilter.parse(spec)))
+        except ValueError as error:
+            parser.error(f"--lt-state-filter: the {spec!r} filter is invalid: {error}")
+
+    metrics = Metrics()
+    mqtt = Mqtt(
+        client=MqttClient(
+            client_id=args.mqtt_client_id,
+            host=args.mqtt_host,
+            port=args.mqtt_port,
+            username=args.mqtt_username,
+            password=args.mqtt_password,
+            protocol=MQTTProtocolVersion(args.mqtt_proto),
+            transport=args.mqtt_transport,
+            inflight=args.mqtt_inflight,
         ),
-        larnitech=LarnitechConfig(
-            host=args.lt_host,
-            port=args.lt_port,
-            key=args.lt_key,
-            ignored_addrs=tuple(args.ignored_addrs),
-            ignored_types=tuple(args.ignored_types),
-            ignored_areas=tuple(args.ignored_areas),
+        discovery=MqttDiscovery(
+            prefix=args.ha_mqtt_discovery_prefix,
         ),
+        subscribe_mode=args.mqtt_subscribe_mode,
+        state_qos=args.mqtt_state_qos,
+    )
+    bridges = LarnitechMqttBridgeGroup(
+        mqtt=mqtt,
+        bridges=[
+            LarnitechMqttBridge(
+                # The connection is shared, the caches are per hub.
+                mqtt=replace(
+                    mqtt,
+                    published=MqttPublishCache(
+                        max_age=args.mqtt_publish_max_age,
+                    ),
+                    discovered=MqttDiscoveryCache(
+                        path=_hub_path(args.mqtt_discovery_cache, prefix),
+                    ),
+                    snapshot=MqttStateSnapshot(
+                        path=_hub_path(args.mqtt_state_snapshot, prefix),
+                        max_age=args.mqtt_state_snapshot_max_age,
+                    ),
+                ),
+                larnitech=LarnitechConfig(
+                    host=host,
+                    port=port,
+                    key=key,
+                    ignored_addrs=tuple(args.ignored_addrs),
+                    ignored_types=tuple(args.ignored_types),
+                    ignored_areas=tuple(args.ignored_areas),
+                    command_window=args.lt_command_window,
+                    command_batch=args.lt_command_batch,
+                    command_rate=args.lt_command_rate,
+                    command_burst=args.lt_command_burst,
+                    command_priorities=tuple(command_priorities),
+                    state_filters=tuple(state_filters),
+                    sync_interval=args.lt_sync_interval,
+                    ping_interval=args.lt_ping_interval,
+                    ping_timeout=args.lt_ping_timeout,
+                ),
+                metrics=metrics,
+                recorder=TrafficRecorder(_hub_path(args.record, prefix)) if args.record else None,
+                prefix=prefix,
+            )
+            for prefix, host, port, key in hubs
+        ],
+        metrics=metrics,
     )
 
-    bridge.run_sync()
+    bridges.run_sync(
+        MetricsServer(metrics, args.metrics_host, args.metrics_port)
+        if args.metrics_port
+        else None,
+    )
 
 
 if __name__ == "__main__":
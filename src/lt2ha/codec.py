@@ -0,0 +1,208 @@
+from codecs import getincrementaldecoder
+from collections.abc import Iterator, Mapping
+from json import JSONDecodeError, JSONDecoder, dumps as _json_dumps, loads as _json_loads
+from re import compile as re_compile
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(data: Any) -> dict:
+    # The mappings other than `dict`, i.e. the devices' configs.
+    if isinstance(data, Mapping):
+        return dict(data)
+
+    raise TypeError(f"Object of type {type(data).__name__} is not JSON serializable")
+
+
+def json_dumps(data: Any) -> bytes:
+    """
+    Encode the `data` to UTF-8 JSON.
+    """
+    if orjson:
+        return orjson.dumps(data, default=_default)
+
+    return _json_dumps(data, ensure_ascii=False, default=_default).encode()
+
+
+def json_loads(data: bytes | str) -> Any:
+    """
+    Decode the JSON, possibly with the control characters within strings and
+    the malformed UTF-8 that LT is known to send.
+    """
+    if orjson:
+        try:
+            # Parses the `bytes` directly, without decoding to `str` first.
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # Strict about the things above, use the forgiving fallback.
+            pass
+
+    return _json_loads(
+        data.decode("utf-8", errors="ignore")
+        if isinstance(data, bytes)
+        else data,
+        strict=False,
+    )
+
+
+_DECODER = JSONDecoder(strict=False)
+_WHITESPACE = re_compile(r"[ \t\n\r]*")
+# The size (in bytes) of the data to decode to `str` at once.
+_CHUNK_SIZE = 65536
+
+
+class _TextReader:
+    """
+    The text of the JSON, decoded from UTF-8 a chunk at a time, so that only
+    the chunk at hand is held in addition to the `data`.
+    """
+
+    __slots__ = ("_data", "_offset", "_decoder", "text", "pos")
+
+    def __init__(self, data: bytes | str) -> None:
+        self._data = data
+        self._offset = 0
+        self._decoder = None if isinstance(data, str) else getincrementaldecoder("utf-8")(errors="ignore")
+        self.text = ""
+        self.pos = 0
+
+    def read(self) -> bool:
+        """
+        Append the next chunk to the `text`, dropping the consumed part.
+
+        :return: Whether there was anything left to read.
+        """
+        if self._offset >= len(self._data):
+            return False
+
+        # At least double the unconsumed text, not to decode a value that
+        # spans many chunks over and over.
+        size = max(_CHUNK_SIZE, len(self.text) - self.pos)
+        chunk = self._data[self._offset:self._offset + size]
+        self._offset += size
+
+        if self._decoder:
+            chunk = self._decoder.decode(chunk, final=self._offset >= len(self._data))
+
+        self.text = self.text[self.pos:] + chunk
+        self.pos = 0
+
+        return True
+
+    def decode(self) -> Any:
+        """
+        Decode the value at the `pos`.
+        """
+        self._skip()
+
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.text, self.pos)
+            except JSONDecodeError:
+                # The value may be cut by the end of the chunk.
+                if self.read():
+                    continue
+
+                raise
+
+            # A number that ends the chunk may continue in the next one.
+            if end == len(self.text) and self.read():
+                continue
+
+            self.pos = end
+
+            return value
+
+    def expect(self, chars: str) -> str:
+        """
+        Skip the whitespace and one of the `chars`.
+
+        :return: The skipped character.
+        """
+        self._skip()
+        char = self.text[self.pos:self.pos + 1]
+
+        if not char or char not in chars:
+            raise JSONDecodeError(f"Expecting one of {chars!r}", self.text, self.pos)
+
+        self.pos += 1
+
+        return char
+
+    def peek(self, char: str) -> bool:
+        """
+        Check whether the next non-whitespace character is the `char`.
+        """
+        try:
+            self.expect(char)
+        except JSONDecodeError:
+            return False
+
+        self.pos -= 1
+
+        return True
+
+    def _skip(self) -> None:
+        self.pos = _WHITESPACE.match(self.text, self.pos).end()
+
+        while self.pos == len(self.text) and self.read():
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+
+
+def json_loads_lazy(data: bytes | str, key: str) -> dict[str, Any]:
+    """
+    Decode the JSON object like `json_loads()`, but with its `key` array as an
+    iterator that decodes the items one at a time, so the whole array is never
+    in memory. The members following the array are added to the object once
+    the iterator is exhausted.
+    """
+    reader = _TextReader(data)
+    result: dict[str, Any] = {}
+    reader.expect("{")
+
+    if reader.peek("}"):
+        return result
+
+    return _decode_members(reader, result, key)
+
+
+def _decode_members(reader: _TextReader, result: dict[str, Any], key: str | None) -> dict[str, Any]:
+    while True:
+        name = reader.decode()
+        reader.expect(":")
+
+        if name == key and reader.peek("["):
+            result[name] = _decode_items(reader, result)
+            return result
+
+        result[name] = reader.decode()
+
+        if reader.expect(",}") == "}":
+            return result
+
+
+def _decode_items(reader: _TextReader, result: dict[str, Any]) -> Iterator[Any]:
+    reader.expect("[")
+
+    if reader.peek("]"):
+        reader.expect("]")
+    else:
+        while True:
+            yield reader.decode()
+
+            if reader.expect(",]") == "]":
+                break
+
+    if reader.expect(",}") == ",":
+        _decode_members(reader, result, None)
+
+
+__all__ = [
+    "json_dumps",
+    "json_loads",
+    "json_loads_lazy",
+]
@@ -4,18 +4,17 @@ from typing import Any, ClassVar
 from .LarnitechDevice import LarnitechDevice
 
 
-@dataclass(frozen=True, init=False)
+@dataclass(frozen=True, init=False, slots=True)
 class LarnitechAirFan(LarnitechDevice):
     entity_type: ClassVar[str] = "fan"
-
-    def _setup_(self) -> None:
-        super()._setup_()
-        self.config.update({
-            "command_topic": "state",
-            "state_topic": "state",
-            "payload_on": "on",
-            "payload_off": "off",
-        })
+    command_priority: ClassVar[int] = 10
+
+    config_template: ClassVar[dict[str, Any]] = {
+        "command_topic": "state",
+        "state_topic": "state",
+        "payload_on": "on",
+        "payload_off": "off",
+    }
 
     def notify_ha(self) -> dict[str, Any]:
         return {
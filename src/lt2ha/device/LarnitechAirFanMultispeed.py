@@ -7,22 +7,22 @@ from .LarnitechAirFan import LarnitechAirFan
 
 # @todo: We're lucky enough that in the current LT setup the speeds are in the correct sequence
 #        so it's possible to use speed as an index. This is fragile. Need a way to say "this is speed X".
-@dataclass(frozen=True, init=False)
+@dataclass(frozen=True, init=False, slots=True)
 class LarnitechAirFanMultispeed(LarnitechDeviceWrapper[LarnitechAirFan]):
     entity_type: ClassVar[str] = "fan"
+    types: ClassVar[tuple[str, ...]] = ("air-fan",)
+    command_priority: ClassVar[int] = 10
 
-    def _setup_(self) -> None:
-        super()._setup_()
-        self.config.update({
-            "command_topic": "state",
-            "state_topic": "state",
-            "payload_on": "on",
-            "payload_off": "off",
-            "percentage_command_topic": "speed",
-            "percentage_state_topic": "speed",
-            "speed_range_min": 1,
-            "speed_range_max": 2,
-        })
+    config_template: ClassVar[dict[str, Any]] = {
+        "command_topic": "state",
+        "state_topic": "state",
+        "payload_on": "on",
+        "payload_off": "off",
+        "percentage_command_topic": "speed",
+        "percentage_state_topic": "speed",
+        "speed_range_min": 1,
+        "speed_range_max": 2,
+    }
 
     def notify_ha(self) -> dict[str, Any]:
         active: str | None = None
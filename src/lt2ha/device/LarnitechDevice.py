@@ -1,57 +1,120 @@
 from dataclasses import dataclass, field, fields, MISSING
-from typing import Any, ClassVar
+from functools import cache
+from types import MappingProxyType
+from typing import Any, Callable, ClassVar, Mapping
 
+from .LarnitechDeviceConfig import LarnitechDeviceConfig
 
-@dataclass(frozen=True, init=False)
+
+_NO_EXTRA: Mapping[str, Any] = MappingProxyType({})
+
+
+@dataclass(frozen=True, slots=True)
+class _Plan:
+    """
+    What the constructor of a device class needs to know, computed once.
+    """
+
+    fields: frozenset[str]
+    defaults: tuple[tuple[str, Any, Callable[[], Any] | None], ...]
+    required: tuple[str, ...]
+    config: Mapping[str, Any]
+
+
+@cache
+def _get_plan(cls: type["LarnitechDevice"]) -> _Plan:
+    cls_fields = fields(cls)
+    config = {}
+
+    for base in reversed(cls.__mro__):
+        config.update(base.__dict__.get("config_template", {}))
+
+    return _Plan(
+        fields=frozenset(f.name for f in cls_fields),
+        defaults=tuple(
+            (f.name, f.default, None if f.default_factory is MISSING else f.default_factory)
+            for f in cls_fields
+            if f.default is not MISSING or f.default_factory is not MISSING
+        ),
+        # The fields without defaults, except `init=False` that are set below.
+        required=tuple(
+            f.name
+            for f in cls_fields
+            if f.init and f.default is MISSING and f.default_factory is MISSING
+        ),
+        config=MappingProxyType({key: value for key, value in config.items() if value is not None}),
+    )
+
+
+# NOTE! The zero-argument `super()` does not work in the slotted dataclasses
+# (the decorator replaces the class), use `super(TheClass, self)` instead.
+@dataclass(frozen=True, init=False, slots=True)
 class LarnitechDevice:
     entity_type: ClassVar[str] = "sensor"
+    config_template: ClassVar[dict[str, Any]] = {
+        "state_topic": "",
+    }
+    """
+    The HA discovery config shared by the devices of the class, extending the
+    ones of the parents. The `None` value removes the inherited key.
+    """
+    command_priority: ClassVar[int] = 0
+    """
+    The commands of a higher priority are sent to LT ahead of the others
+    waiting in the queue.
+    """
+    state_filter_keys: ClassVar[tuple[str, ...]] = ("state_topic",)
+    """
+    The keys of `notify_ha()` with the numeric values to filter, if a filter
+    is configured for the device. The values of the other keys are sent as
+    they change.
+    """
 
     addr: str
     name: str
     area: str
     type: str
     status: dict = field(repr=False)
-    config: dict = field(init=False, repr=False)
-    extra: dict = field(init=False, repr=False)
+    config: LarnitechDeviceConfig = field(init=False, repr=False)
+    extra: Mapping[str, Any] = field(init=False, repr=False)
 
     def __init__(self, data: dict) -> None:
-        extra = {}
-        cls_fields = fields(self)
-        defined_fields = {f.name for f in cls_fields}
+        plan = _get_plan(type(self))
+        extra = None
 
         for key, value in data.items():
-            if key in defined_fields:
+            if key in plan.fields:
                 self._setattr(key, value)
             else:
+                if extra is None:
+                    extra = {}
+
                 extra[key] = value
 
+        for name, default, default_factory in plan.defaults:
+            if name not in data:
+                self._setattr(name, default if default_factory is None else default_factory())
+
         # Ensure all required fields (without defaults) are set.
-        for cls_field in cls_fields:
-            if cls_field.name not in data:
-                if cls_field.default is MISSING:
-                    if cls_field.default_factory is MISSING:
-                        if cls_field.init:
-                            raise TypeError(f"Missing required argument: '{cls_field.name}'")
-                    else:
-                        self._setattr(cls_field.name, cls_field.default_factory())
-                else:
-                    self._setattr(cls_field.name, cls_field.default)
+        for name in plan.required:
+            if name not in data:
+                raise TypeError(f"Missing required argument: '{name}'")
 
         self._setattr(
             name="extra",
-            value=extra,
+            value=_NO_EXTRA if extra is None else extra,
         )
         self._setattr(
             name="config",
-            value={
-                "state_topic": "",
-            },
+            value=LarnitechDeviceConfig(plan.config),
         )
 
         self._setup_()
 
     def _setup_(self) -> None:
-        pass
+        """
+        Adjust the instance's config, if the `config_template` is not enough.
+        """
 
     def _setattr(self, name: str, value: Any) -> None:
         object.__setattr__(self, name, value)
@@ -0,0 +1,58 @@
+from collections.abc import Iterator, Mapping, MutableMapping
+from typing import Any
+
+
+class LarnitechDeviceConfig(MutableMapping[str, Any]):
+    """
+    The HA discovery config of a device, layered over the template shared by
+    all devices of its class. Nothing is copied until the value is set, and
+    then only that value is stored on the device.
+    """
+
+    __slots__ = ("_template", "_own")
+
+    def __init__(self, template: Mapping[str, Any]) -> None:
+        self._template = template
+        self._own: dict[str, Any] | None = None
+
+    def __getitem__(self, key: str) -> Any:
+        if self._own is not None and key in self._own:
+            return self._own[key]
+
+        return self._template[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if self._own is None:
+            self._own = {}
+
+        self._own[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        # The template is shared, its keys are removed in the class instead.
+        if self._own is None or key not in self._own or key in self._template:
+            raise KeyError(key)
+
+        del self._own[key]
+
+    def __iter__(self) -> Iterator[str]:
+        # The template's order first, just as if it was copied.
+        yield from self._template
+
+        if self._own is not None:
+            for key in self._own:
+                if key not in self._template:
+                    yield key
+
+    def __len__(self) -> int:
+        if self._own is None:
+            return len(self._template)
+
+        return len(self._template) + sum(1 for key in self._own if key not in self._template)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+
+__all__ = [
+    "LarnitechDeviceConfig",
+]
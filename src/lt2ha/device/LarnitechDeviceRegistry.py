@@ -16,11 +16,26 @@ class LarnitechDeviceRegistry:
             for addr in device.children:
                 self._aliases[addr] = device.addr
 
+    def remove(self, addr: str) -> LarnitechDevice | None:
+        device = self._registry.pop(addr, None)
+
+        if isinstance(device, LarnitechDeviceWrapper):
+            for child in device.children:
+                self._aliases.pop(child, None)
+
+        return device
+
     def get(self, addr: str) -> LarnitechDevice | None:
         alias = self._aliases.get(addr, addr)
 
         return self._registry.get(alias)
 
+    def __contains__(self, addr: str) -> bool:
+        """
+        Check whether the device is registered under the `addr` (not an alias).
+        """
+        return addr in self._registry
+
     def __iter__(self) -> Generator[LarnitechDevice, None, None]:
         for device in self._registry.values():
             yield device
@@ -1,6 +1,6 @@
 from abc import ABC
 from dataclasses import dataclass
-from typing import Generic, TypeVar, TypeGuard
+from typing import ClassVar, Generic, TypeVar, TypeGuard
 
 from .LarnitechDevice import LarnitechDevice
 from ..utils import get_generic_args
@@ -9,8 +9,14 @@ from ..utils import get_generic_args
 _T = TypeVar("_T", bound=LarnitechDevice)
 
 
-@dataclass(frozen=True, init=False)
+@dataclass(frozen=True, init=False, slots=True)
 class LarnitechDeviceWrapper(Generic[_T], LarnitechDevice, ABC):
+    types: ClassVar[tuple[str, ...]] = ()
+    """
+    The types (see `device._get_type()`) of the devices to combine. Those
+    of the same `type`, `sub-type` and `area` make one wrapper.
+    """
+
     children: tuple[str, ...]
     """
     The list of `addr` this device wraps.
@@ -48,7 +54,7 @@ class LarnitechDeviceWrapper(Generic[_T], LarnitechDevice, ABC):
         if sub_type:
             data["sub-type"] = sub_type
 
-        super().__init__(data)
+        super(LarnitechDeviceWrapper, self).__init__(data)
 
     def set_status(self, status: dict, addr: str) -> None:
         self.status[addr].update(status)
@@ -1,22 +1,20 @@
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, ClassVar
 
 from .LarnitechLamp import LarnitechLamp
 
 
-@dataclass(frozen=True, init=False)
+@dataclass(frozen=True, init=False, slots=True)
 class LarnitechDimmerLamp(LarnitechLamp):
-    def _setup_(self) -> None:
-        super()._setup_()
-        self.config.update({
-            "brightness_scale": 100,
-            "brightness_command_topic": "level",
-            "brightness_state_topic": "level",
-        })
+    config_template: ClassVar[dict[str, Any]] = {
+        "brightness_scale": 100,
+        "brightness_command_topic": "level",
+        "brightness_state_topic": "level",
+    }
 
     def notify_ha(self) -> dict[str, Any]:
         return {
-            **super().notify_ha(),
+            **super(LarnitechDimmerLamp, self).notify_ha(),
             "brightness_state_topic": self.status["level"],
         }
 
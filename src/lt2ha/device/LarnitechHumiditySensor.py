@@ -1,17 +1,16 @@
 from dataclasses import dataclass
+from typing import Any, ClassVar
 
 from .LarnitechDevice import LarnitechDevice
 
 
-@dataclass(frozen=True, init=False)
+@dataclass(frozen=True, init=False, slots=True)
 class LarnitechHumiditySensor(LarnitechDevice):
-    def _setup_(self) -> None:
-        super()._setup_()
-        self.config.update({
-            "state_class": "measurement",
-            "device_class": "humidity",
-            "unit_of_measurement": "%",
-        })
+    config_template: ClassVar[dict[str, Any]] = {
+        "state_class": "measurement",
+        "device_class": "humidity",
+        "unit_of_measurement": "%",
+    }
 
 
 __all__ = [
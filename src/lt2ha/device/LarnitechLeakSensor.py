@@ -1,17 +1,16 @@
 from dataclasses import dataclass
+from typing import Any, ClassVar
 
 from .LarnitechMotionSensor import LarnitechMotionSensor
 
 
-@dataclass(frozen=True, init=False)
+@dataclass(frozen=True, init=False, slots=True)
 class LarnitechLeakSensor(LarnitechMotionSensor):
-    def _setup_(self) -> None:
-        super()._setup_()
-        self.config.update({
-            "device_class": "moisture",
-            "payload_on": "leakage",
-            "payload_off": "ok",
-        })
+    config_template: ClassVar[dict[str, Any]] = {
+        "device_class": "moisture",
+        "payload_on": "leakage",
+        "payload_off": "ok",
+    }
 
     def _get_ha_state(self) -> str:
         # This sensor's value is inversed in HA.
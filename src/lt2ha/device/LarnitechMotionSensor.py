@@ -4,17 +4,15 @@ from typing import Any, ClassVar
 from .LarnitechDevice import LarnitechDevice
 
 
-@dataclass(frozen=True, init=False)
+@dataclass(frozen=True, init=False, slots=True)
 class LarnitechMotionSensor(LarnitechDevice):
     entity_type: ClassVar[str] = "binary_sensor"
 
-    def _setup_(self) -> None:
-        super()._setup_()
-        self.config.update({
-            "device_class": "motion",
-            "payload_on": "on",
-            "payload_off": "off",
-        })
+    config_template: ClassVar[dict[str, Any]] = {
+        "device_class": "motion",
+        "payload_on": "on",
+        "payload_off": "off",
+    }
 
     def notify_ha(self) -> dict[str, Any]:
         return {
@@ -1,20 +1,18 @@
 from dataclasses import dataclass
-from typing import ClassVar
+from typing import Any, ClassVar
 
 from .LarnitechDevice import LarnitechDevice
 
 
-@dataclass(frozen=True, init=False)
+@dataclass(frozen=True, init=False, slots=True)
 class LarnitechToggleable(LarnitechDevice):
     entity_type: ClassVar[str] = "switch"
 
-    def _setup_(self) -> None:
-        super()._setup_()
-        self.config.update({
-            "command_topic": "",
-            "payload_on": "on",
-            "payload_off": "off",
-        })
+    config_template: ClassVar[dict[str, Any]] = {
+        "command_topic": "",
+        "payload_on": "on",
+        "payload_off": "off",
+    }
 
 
 __all__ = [
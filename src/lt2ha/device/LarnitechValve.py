@@ -1,23 +1,23 @@
 from dataclasses import dataclass
-from typing import ClassVar
+from typing import Any, ClassVar
 
 from .LarnitechDevice import LarnitechDevice
 
 
-@dataclass(frozen=True, init=False)
+@dataclass(frozen=True, init=False, slots=True)
 class LarnitechValve(LarnitechDevice):
     entity_type: ClassVar[str] = "valve"
+    # I.e. to close the water after a leak.
+    command_priority: ClassVar[int] = 20
 
-    def _setup_(self) -> None:
-        super()._setup_()
-        self.config.update({
-            "command_topic": "",
-            "state_topic": "",
-            "state_open": "opened",
-            "state_closed": "closed",
-            "payload_open": "open",
-            "payload_close": "close",
-        })
+    config_template: ClassVar[dict[str, Any]] = {
+        "command_topic": "",
+        "state_topic": "",
+        "state_open": "opened",
+        "state_closed": "closed",
+        "payload_open": "open",
+        "payload_close": "close",
+    }
 
 
 __all__ = [
@@ -4,31 +4,33 @@ from typing import Any, ClassVar
 from .LarnitechDevice import LarnitechDevice
 
 
-@dataclass(frozen=True, init=False)
+@dataclass(frozen=True, init=False, slots=True)
 class LarnitechValveHeating(LarnitechDevice):
     entity_type: ClassVar[str] = "climate"
 
+    config_template: ClassVar[dict[str, Any]] = {
+        "state_topic": None,
+        "mode_command_topic": "mode",
+        "mode_state_topic": "mode",
+        "preset_mode_command_topic": "preset",
+        "preset_mode_state_topic": "preset",
+        "temperature_command_topic": "temperature",
+        "temperature_state_topic": "temperature",
+        "current_temperature_topic": "current_temperature",
+        "modes": ["off", "heat"],
+        "temp_step": 0.5,
+        "min_temp": 15,
+        "max_temp": 35,
+        "temperature_unit": "C",
+    }
+
+    # Only the measured one, the target must reflect the changes right away.
+    state_filter_keys: ClassVar[tuple[str, ...]] = ("current_temperature_topic",)
+
     automations: list[str]
 
     def _setup_(self) -> None:
-        super()._setup_()
-
-        self.config.pop("state_topic")
-        self.config.update({
-            "mode_command_topic": "mode",
-            "mode_state_topic": "mode",
-            "preset_mode_command_topic": "preset",
-            "preset_mode_state_topic": "preset",
-            "temperature_command_topic": "temperature",
-            "temperature_state_topic": "temperature",
-            "current_temperature_topic": "current_temperature",
-            "modes": ["off", "heat"],
-            "preset_modes": self.automations,
-            "temp_step": 0.5,
-            "min_temp": 15,
-            "max_temp": 35,
-            "temperature_unit": "C",
-        })
+        self.config["preset_modes"] = self.automations
 
     def notify_ha(self) -> dict[str, Any]:
         values = {}
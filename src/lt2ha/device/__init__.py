@@ -1,8 +1,11 @@
+from collections.abc import Iterable
+
 from ..LarnitechConfig import LarnitechConfig
 
 from .LarnitechAirFan import LarnitechAirFan
 from .LarnitechAirFanMultispeed import LarnitechAirFanMultispeed
 from .LarnitechDevice import LarnitechDevice
+from .LarnitechDeviceConfig import LarnitechDeviceConfig
 from .LarnitechDeviceRegistry import LarnitechDeviceRegistry
 from .LarnitechDeviceWrapper import LarnitechDeviceWrapper
 from .LarnitechDimmerLamp import LarnitechDimmerLamp
@@ -37,6 +40,14 @@ WRAPPERS = (
     LarnitechAirFanMultispeed,
 )
 
+# The wrapper for each type it combines.
+_WRAPPED: dict[str, type[LarnitechDeviceWrapper]] = {}
+
+for _wrapper in WRAPPERS:
+    for _type in _wrapper.types:
+        assert _type not in _WRAPPED, f"The {_type} is combined by both {_WRAPPED[_type]} and {_wrapper}"
+        _WRAPPED[_type] = _wrapper
+
 
 def _get_type(data: dict) -> str:
     sub_type = data.get("sub-type")
@@ -50,13 +61,15 @@ def _get_type(data: dict) -> str:
 
 
 def group(
-    items: list[dict],
+    items: Iterable[dict],
     client: LarnitechConfig,
 ) -> tuple[tuple[LarnitechDevice, ...], tuple[dict, ...]]:
-    groups: dict[type[LarnitechDeviceWrapper], dict[str, list[LarnitechDevice]]] = {}
+    # The devices to combine by the wrapper, `type`, `sub-type` and `area`.
+    groups: dict[tuple[type[LarnitechDeviceWrapper], str, str | None, str], list[LarnitechDevice]] = {}
     to_ignore = []
     to_register = []
 
+    # A single pass, so the `items` may be decoded as they are consumed.
     for item in items:
         item_type = _get_type(item)
 
@@ -68,23 +81,19 @@ def group(
             to_ignore.append(item)
         else:
             device = LIB.get(item_type, LarnitechDevice)(item)
+            wrapper = _WRAPPED.get(item_type)
 
-            if WRAPPERS:
-                for wrapper in WRAPPERS:
-                    if wrapper.wraps(device):
-                        groups.setdefault(wrapper, {}).setdefault(device.area, []).append(device)
-                    else:
-                        to_register.append(device)
+            if wrapper:
+                groups.setdefault((wrapper, item["type"], item.get("sub-type"), device.area), []).append(device)
             else:
                 to_register.append(device)
 
-    for wrapper, devices_groups in groups.items():
-        if len(devices_groups) == 1:
-            for devices_group in devices_groups.values():
-                to_register.append(devices_group)
+    for (wrapper, *_), devices in groups.items():
+        # There is nothing to combine a single device with.
+        if len(devices) == 1:
+            to_register.extend(devices)
         else:
-            for devices_group in devices_groups.values():
-                to_register.append(wrapper(devices_group))
+            to_register.append(wrapper(devices))
 
     return tuple(to_register), tuple(to_ignore)
 
@@ -92,6 +101,7 @@ def group(
 __all__ = [
     "LarnitechDeviceRegistry",
     "LarnitechDevice",
+    "LarnitechDeviceConfig",
     "LarnitechDeviceWrapper",
     "group",
 ]
@@ -0,0 +1,88 @@
+from typing import Iterator
+
+from .MetricsCounter import MetricsCounter
+from .MetricsGauge import MetricsGauge
+from .MetricsHistogram import MetricsHistogram
+from .MetricsMetric import MetricsMetric
+
+
+class Metrics:
+    """
+    The bridge's metrics. Updating them is cheap, the cost of formatting is
+    only paid when they are collected.
+    """
+
+    def __init__(self) -> None:
+        self.lt_frames = MetricsCounter(
+            "lt2ha_lt_frames_total",
+            "The frames received from LT per event or response.",
+            ("hub", "kind"),
+        )
+        self.lt_decode = MetricsHistogram(
+            "lt2ha_lt_decode_seconds",
+            "The time to decode a frame received from LT.",
+            ("hub",),
+        )
+        self.lt_rtt = MetricsHistogram(
+            "lt2ha_lt_rtt_seconds",
+            "The round trip of a ping to LT.",
+            ("hub",),
+        )
+        self.lt_reconnects = MetricsCounter(
+            "lt2ha_lt_reconnects_total",
+            "The number of times the connection to LT was lost.",
+            ("hub",),
+        )
+        self.ha_publishes = MetricsCounter(
+            "lt2ha_ha_publishes_total",
+            "The states sent (or skipped as unchanged or filtered, or failed to be sent) to HA.",
+            ("hub", "result"),
+        )
+        self.ha_commands = MetricsCounter(
+            "lt2ha_ha_commands_total",
+            "The commands received from HA.",
+            ("hub",),
+        )
+        self.ha_unknown_topics = MetricsCounter(
+            "lt2ha_ha_unknown_topics_total",
+            "The messages from HA to the topics no device is registered for, with an empty hub if none has the prefix.",
+            ("hub",),
+        )
+        self.command_queue_depth = MetricsGauge(
+            "lt2ha_command_queue_depth",
+            "The number of devices with the commands waiting to be sent to LT.",
+            ("hub",),
+        )
+        self.commands_pending = MetricsGauge(
+            "lt2ha_commands_pending",
+            "The number of devices with the commands from HA not yet confirmed by LT.",
+            ("hub",),
+        )
+        self.command_queue_delay = MetricsHistogram(
+            "lt2ha_command_queue_delay_seconds",
+            "The time from receiving a command from HA to sending it to LT.",
+            ("hub", "priority"),
+        )
+        self.command_latency = MetricsHistogram(
+            "lt2ha_command_latency_seconds",
+            "The time from receiving a command from HA to LT acknowledging it.",
+            ("hub",),
+        )
+        self.device_notify = MetricsHistogram(
+            "lt2ha_device_notify_seconds",
+            "The time a device takes to convert a value for HA or LT.",
+            ("hub", "device", "direction"),
+        )
+
+    def __iter__(self) -> Iterator[MetricsMetric]:
+        for value in vars(self).values():
+            if isinstance(value, MetricsMetric):
+                yield value
+
+    def render(self) -> str:
+        return "".join(f"{line}\n" for metric in self for line in metric.render())
+
+
+__all__ = [
+    "Metrics",
+]
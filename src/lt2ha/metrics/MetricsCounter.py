@@ -0,0 +1,26 @@
+from typing import Iterator
+
+from .MetricsMetric import MetricsMetric
+
+
+class MetricsCounter(MetricsMetric):
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...] = ()) -> None:
+        super().__init__(name, description, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def get(self, *labels: str) -> float:
+        return self._values.get(labels, 0)
+
+    def _render_samples(self) -> Iterator[str]:
+        for labels, value in tuple(self._values.items()):
+            yield f"{self.name}{self._format_labels(labels)} {value}"
+
+
+__all__ = [
+    "MetricsCounter",
+]
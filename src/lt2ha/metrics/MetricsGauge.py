@@ -0,0 +1,34 @@
+from typing import Callable, Iterator
+
+from .MetricsMetric import MetricsMetric
+
+
+class MetricsGauge(MetricsMetric):
+    """
+    A value that is read only when the metrics are collected.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...] = ()) -> None:
+        super().__init__(name, description, labels)
+        self._sources: dict[tuple[str, ...], list[Callable[[], float]]] = {}
+
+    def track(self, source: Callable[[], float], *labels: str) -> None:
+        """
+        Add the source of the value; the values of several sources with the
+        same labels are summed.
+        """
+        self._sources.setdefault(labels, []).append(source)
+
+    def get(self, *labels: str) -> float:
+        return sum(source() for source in self._sources.get(labels, ()))
+
+    def _render_samples(self) -> Iterator[str]:
+        for labels in tuple(self._sources):
+            yield f"{self.name}{self._format_labels(labels)} {self.get(*labels)}"
+
+
+__all__ = [
+    "MetricsGauge",
+]
@@ -0,0 +1,67 @@
+from bisect import bisect_left
+from typing import Iterator
+
+from .MetricsMetric import MetricsMetric
+
+
+# From 50 µs to 10 s, the range of everything the bridge measures.
+DEFAULT_BUCKETS = (
+    0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5,
+    1, 2.5, 5, 10,
+)
+
+
+class MetricsHistogram(MetricsMetric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, description, labels)
+        self._buckets = buckets
+        # Per labels: the count per bucket (the last one is `+Inf`), the sum.
+        self._values: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        values = self._values.get(labels)
+
+        if values is None:
+            values = self._values[labels] = ([0] * (len(self._buckets) + 1), [0.0])
+
+        # Not cumulative here, it's summed up on rendering.
+        values[0][bisect_left(self._buckets, value)] += 1
+        values[1][0] += value
+
+    def count(self, *labels: str) -> int:
+        values = self._values.get(labels)
+
+        return sum(values[0]) if values else 0
+
+    def sum(self, *labels: str) -> float:
+        values = self._values.get(labels)
+
+        return values[1][0] if values else 0.0
+
+    def _render_samples(self) -> Iterator[str]:
+        for labels, (counts, total) in tuple(self._values.items()):
+            cumulative = 0
+
+            for bound, count in zip((*self._buckets, "+Inf"), counts):
+                cumulative += count
+                yield f"{self.name}_bucket{self._format_labels(labels, le=str(bound))} {cumulative}"
+
+            yield f"{self.name}_sum{self._format_labels(labels)} {total[0]}"
+            yield f"{self.name}_count{self._format_labels(labels)} {cumulative}"
+
+
+__all__ = [
+    "DEFAULT_BUCKETS",
+    "MetricsHistogram",
+]
@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from typing import Iterator
+
+
+class MetricsMetric(ABC):
+    """
+    A metric in the Prometheus text exposition format.
+    """
+
+    kind: str = "untyped"
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.description = description
+        self.labels = labels
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.description}"
+        yield f"# TYPE {self.name} {self.kind}"
+        yield from self._render_samples()
+
+    @abstractmethod
+    def _render_samples(self) -> Iterator[str]:
+        pass
+
+    def _format_labels(self, values: tuple[str, ...], **extra: str) -> str:
+        pairs = [*zip(self.labels, values), *extra.items()]
+
+        if not pairs:
+            return ""
+
+        return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+
+__all__ = [
+    "MetricsMetric",
+]
@@ -0,0 +1,55 @@
+import asyncio
+
+from .Metrics import Metrics
+
+
+class MetricsServer:
+    """
+    A minimal HTTP server exposing the metrics at `/metrics` for Prometheus
+    to scrape.
+    """
+
+    def __init__(self, metrics: Metrics, host: str, port: int) -> None:
+        self._metrics = metrics
+        self._host = host
+        self._port = port
+
+    async def start(self) -> asyncio.Server:
+        return await asyncio.start_server(self._handle, self._host, self._port)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request = await reader.readline()
+
+            # Skip the headers.
+            while (await reader.readline()).strip():
+                pass
+
+            parts = request.split()
+
+            if len(parts) > 1 and parts[0] == b"GET" and parts[1].split(b"?")[0] == b"/metrics":
+                status = "200 OK"
+                body = self._metrics.render().encode()
+            else:
+                status = "404 Not Found"
+                body = b""
+
+            writer.write(
+                (
+                    f"HTTP/1.1 {status}\r\n"
+                    "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    "Connection: close\r\n"
+                    "\r\n"
+                ).encode() + body,
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+__all__ = [
+    "MetricsServer",
+]
@@ -0,0 +1,16 @@
+from .Metrics import Metrics
+from .MetricsCounter import MetricsCounter
+from .MetricsGauge import MetricsGauge
+from .MetricsHistogram import MetricsHistogram
+from .MetricsMetric import MetricsMetric
+from .MetricsServer import MetricsServer
+
+
+__all__ = [
+    "Metrics",
+    "MetricsCounter",
+    "MetricsGauge",
+    "MetricsHistogram",
+    "MetricsMetric",
+    "MetricsServer",
+]
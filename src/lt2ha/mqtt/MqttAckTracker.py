@@ -0,0 +1,69 @@
+import asyncio
+
+
+class MqttAckTracker:
+    """
+    Awaits the broker's acknowledgements (SUBACK, PUBACK) for a set of
+    message IDs.
+
+    The client runs on the event loop, so a message ID is always tracked
+    before its acknowledgement can be read from the socket.
+    """
+
+    def __init__(self) -> None:
+        self._done: asyncio.Event | None = None
+        self._pending: set[int] = set()
+        self._unsent = False
+
+    def start(self) -> None:
+        """
+        Start collecting the acknowledgements.
+        """
+        self._done = asyncio.Event()
+        self._pending.clear()
+        self._unsent = False
+
+    def track(self, mid: int | None) -> None:
+        if self._done is None:
+            return
+
+        # Not sent, i.e. while disconnected, so never to be acknowledged.
+        if not mid:
+            self._unsent = True
+            return
+
+        self._pending.add(mid)
+
+    def ack(self, mid: int) -> None:
+        if self._done is None or mid not in self._pending:
+            return
+
+        self._pending.discard(mid)
+
+        if not self._pending:
+            self._done.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Wait for all tracked messages to be acknowledged and stop collecting.
+
+        :return: Whether everything was sent and acknowledged in time.
+        """
+        done = self._done
+
+        if not self._pending:
+            done.set()
+
+        try:
+            await asyncio.wait_for(done.wait(), timeout)
+            return not self._unsent
+        except TimeoutError:
+            return False
+        finally:
+            self._done = None
+            self._pending.clear()
+
+
+__all__ = [
+    "MqttAckTracker",
+]
@@ -1,15 +1,30 @@
-from json import dumps as json_dumps
-from typing import Any, Callable, Literal, Self
+import asyncio
+import logging
+from collections.abc import Mapping
+from typing import Any, Awaitable, Callable, Literal, Self
 
 from paho.mqtt.client import (
     CallbackAPIVersion,
     Client,
+    MQTTErrorCode,
     MQTTMessage,
     MQTTMessageInfo,
     MQTTProtocolVersion,
     PayloadType,
 )
 from paho.mqtt.properties import Properties
+from paho.mqtt.reasoncodes import ReasonCode
+
+from ..codec import json_dumps
+
+
+_LOGGER = logging.getLogger(__name__)
+
+# The interval (in seconds) for the keepalive and the connection checks.
+_MISC_INTERVAL = 1
+# The bounds (in seconds) of the exponential backoff between reconnects.
+_RECONNECT_DELAY_MIN = 1
+_RECONNECT_DELAY_MAX = 60
 
 
 class MqttClient(Client):
@@ -22,6 +37,7 @@ class MqttClient(Client):
         password: str,
         protocol: MQTTProtocolVersion,
         transport: Literal["tcp", "websockets", "unix"],
+        inflight: int = 100,
     ) -> None:
         super().__init__(
             protocol=protocol,
@@ -31,7 +47,41 @@ class MqttClient(Client):
         )
 
         self.username_pw_set(username, password)
-        self.connect(host, port)
+        # The number of QoS 1 messages awaiting the broker's acknowledgement
+        # at once, the others wait in the client. Only set before connecting.
+        self.max_inflight_messages_set(inflight)
+        # Connects in `run()`.
+        self.connect_async(host, port)
+
+        self.connected = asyncio.Event()
+        """
+        Set while there is a connection to publish and subscribe over.
+        """
+
+        self._refused = 0
+        """
+        The number of consecutive connections refused by the broker.
+        """
+
+        self.on_connect = None
+        Client.on_disconnect.fset(self, lambda *_: self.connected.clear())
+
+    @Client.on_connect.setter
+    def on_connect(self, func: Callable[[], None] | None) -> None:
+        def wrapper(_: Self, __: Any, ___: Any, reason_code: ReasonCode, *____: Any) -> None:
+            if reason_code.is_failure:
+                self._refused += 1
+                _LOGGER.warning(f"⚠️ MQTT: Connection refused ({reason_code})")
+                return
+
+            self._refused = 0
+            self.connected.set()
+
+            # The session is clean, so it's the place to (re)subscribe.
+            if func:
+                func()
+
+        Client.on_connect.fset(self, wrapper)
 
     @Client.on_message.setter
     def on_message(self, func: Callable[[MQTTMessage], None] | None) -> None:
@@ -40,22 +90,141 @@ class MqttClient(Client):
 
         Client.on_message.fset(self, wrapper)
 
+    @Client.on_subscribe.setter
+    def on_subscribe(self, func: Callable[[int], None] | None) -> None:
+        def wrapper(_: Self, __: Any, mid: int, *___: Any) -> None:
+            func(mid)
+
+        Client.on_subscribe.fset(self, wrapper)
+
+    @Client.on_publish.setter
+    def on_publish(self, func: Callable[[int], None] | None) -> None:
+        def wrapper(_: Self, __: Any, mid: int, *___: Any) -> None:
+            func(mid)
+
+        Client.on_publish.fset(self, wrapper)
+
+    async def run(self) -> None:
+        """
+        Connect and drive the client on the running event loop until
+        cancelled, in place of the `loop_start()` thread: the loop watches
+        the socket, so all the callbacks run on it. Reconnects when the
+        connection is lost.
+        """
+        loop = asyncio.get_running_loop()
+        # The socket may be closed by the time the loop gets to it, so it's
+        # watched by the file descriptor.
+        self.on_socket_open = lambda _, __, sock: self._in_loop(loop, self._watch_socket, loop, sock.fileno())
+        self.on_socket_close = lambda _, __, sock: self._in_loop(loop, self._unwatch_socket, loop, sock.fileno())
+        self.on_socket_register_write = lambda _, __, sock: self._in_loop(
+            loop,
+            loop.add_writer,
+            sock.fileno(),
+            self.loop_write,
+        )
+        self.on_socket_unregister_write = lambda _, __, sock: self._in_loop(loop, loop.remove_writer, sock.fileno())
+
+        try:
+            while True:
+                if self.loop_misc() == MQTTErrorCode.MQTT_ERR_NO_CONN:
+                    # In a thread, to not hold the loop (and the hubs) for as
+                    # long as it takes. Nothing is sent till it's `connected`.
+                    await self._connect(lambda: loop.run_in_executor(None, self.reconnect))
+
+                await asyncio.sleep(_MISC_INTERVAL)
+        finally:
+            self.disconnect()
+            # Send it right away, the loop may not run anymore.
+            self.loop_write()
+
+    async def _connect(self, connect: Callable[[], Awaitable[Any]]) -> None:
+        delay = _RECONNECT_DELAY_MIN
+
+        # The broker is up but doesn't let in (e.g. with wrong credentials),
+        # so back off just as when it's down.
+        if self._refused:
+            delay = min(_RECONNECT_DELAY_MIN * 2 ** (self._refused - 1), _RECONNECT_DELAY_MAX)
+            _LOGGER.warning(f"⚠️ MQTT: Reconnecting in {delay}s")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _RECONNECT_DELAY_MAX)
+
+        while True:
+            try:
+                await connect()
+                return
+            except OSError as e:
+                _LOGGER.warning(f"⚠️ MQTT: Connection failed ({e!r}), reconnecting in {delay}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, _RECONNECT_DELAY_MAX)
+
+    @staticmethod
+    def _in_loop(loop: asyncio.AbstractEventLoop, func: Callable, *args: Any) -> None:
+        """
+        Call the `func` on the `loop`, as the socket callbacks of a connection
+        made in a thread come from that thread.
+        """
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is loop:
+            func(*args)
+        else:
+            loop.call_soon_threadsafe(func, *args)
+
+    def _watch_socket(self, loop: asyncio.AbstractEventLoop, fd: int) -> None:
+        loop.add_reader(fd, self.loop_read)
+
+        if self.want_write():
+            loop.add_writer(fd, self.loop_write)
+
+    def _unwatch_socket(self, loop: asyncio.AbstractEventLoop, fd: int) -> None:
+        self.connected.clear()
+        loop.remove_reader(fd)
+        loop.remove_writer(fd)
+
     def publish(
         self,
         topic: str,
-        payload: PayloadType | dict = None,
+        payload: PayloadType | Mapping = None,
         qos: int = 0,
         retain: bool = False,
         properties: Properties | None = None,
     ) -> MQTTMessageInfo:
+        if not self.connected.is_set():
+            return self._not_connected()
+
         return super().publish(
             topic,
-            json_dumps(payload) if isinstance(payload, dict) else payload,
+            json_dumps(payload) if isinstance(payload, Mapping) else payload,
             qos=qos,
             retain=retain,
             properties=properties,
         )
 
+    def subscribe(self, *args: Any, **kwargs: Any) -> tuple[MQTTErrorCode, int | None]:
+        if not self.connected.is_set():
+            return MQTTErrorCode.MQTT_ERR_NO_CONN, None
+
+        return super().subscribe(*args, **kwargs)
+
+    def unsubscribe(self, *args: Any, **kwargs: Any) -> tuple[MQTTErrorCode, int | None]:
+        if not self.connected.is_set():
+            return MQTTErrorCode.MQTT_ERR_NO_CONN, None
+
+        return super().unsubscribe(*args, **kwargs)
+
+    @staticmethod
+    def _not_connected() -> MQTTMessageInfo:
+        # Like the client does for QoS 0, for any QoS: no connection is
+        # touched while it's being made in a thread. The states are resent
+        # once connected anyway.
+        info = MQTTMessageInfo(0)
+        info.rc = MQTTErrorCode.MQTT_ERR_NO_CONN
+
+        return info
+
 
 __all__ = [
     "MqttClient",
@@ -4,6 +4,14 @@ from dataclasses import dataclass
 @dataclass(frozen=True)
 class MqttDiscovery:
     prefix: str
+    payload_online: str = "online"
+
+    @property
+    def status_topic(self) -> str:
+        """
+        The topic where HA announces its (re)start (the birth message).
+        """
+        return f"{self.prefix}/status"
 
 
 __all__ = [
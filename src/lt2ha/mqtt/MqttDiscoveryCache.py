@@ -0,0 +1,61 @@
+import os
+from collections.abc import Mapping
+from hashlib import sha1
+from json import dumps as json_dumps, load as json_load, dump as json_dump
+
+
+class MqttDiscoveryCache:
+    """
+    Fingerprints of the retained discovery configs published by the previous
+    run, so the unchanged ones are not announced to HA again.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self._path = path
+        """
+        The file to persist the fingerprints to. Without it, every config
+        is considered new.
+        """
+
+        self._previous: dict[str, str] = {}
+        self._current: dict[str, str] = {}
+
+        if path and os.path.exists(path):
+            with open(path) as file:
+                self._previous = json_load(file)
+
+    def changed(self, topic: str, config: Mapping) -> bool:
+        """
+        Remember the `config` and check whether it differs from the published.
+        """
+        fingerprint = sha1(json_dumps(config, sort_keys=True, default=dict).encode()).hexdigest()
+        self._current[topic] = fingerprint
+
+        return self._previous.get(topic) != fingerprint
+
+    def forget(self, topic: str) -> None:
+        """
+        Stop considering the `topic` as published.
+        """
+        self._current.pop(topic, None)
+
+    def stale(self) -> tuple[str, ...]:
+        """
+        Get the topics that were published previously but not this time.
+        """
+        return tuple(topic for topic in self._previous if topic not in self._current)
+
+    def save(self) -> None:
+        self._previous = dict(self._current)
+
+        if self._path:
+            # Replace atomically to never leave a half-written file behind.
+            with open(f"{self._path}.tmp", "w") as file:
+                json_dump(self._previous, file)
+
+            os.replace(f"{self._path}.tmp", self._path)
+
+
+__all__ = [
+    "MqttDiscoveryCache",
+]
@@ -0,0 +1,83 @@
+import asyncio
+
+
+class MqttInflightWindow:
+    """
+    Bounds the number of publishes awaiting the broker's acknowledgement: the
+    PUBACK with QoS 1, or the write to the socket with QoS 0 (the client
+    reports both via `on_publish`). Lets many messages be pushed without
+    piling them up in the client's outgoing buffer.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._size = max(size, 1)
+        self._pending: set[int] = set()
+        self._free = asyncio.Event()
+        self._free.set()
+        self._done = asyncio.Event()
+        self._done.set()
+
+        self.tracked = 0
+        """
+        The number of messages tracked so far.
+        """
+
+    def track(self, mid: int) -> None:
+        self._pending.add(mid)
+        self._done.clear()
+        self.tracked += 1
+
+        if len(self._pending) >= self._size:
+            self._free.clear()
+
+    def ack(self, mid: int) -> None:
+        if mid not in self._pending:
+            return
+
+        self._pending.discard(mid)
+
+        if len(self._pending) < self._size:
+            self._free.set()
+
+        if not self._pending:
+            self._done.set()
+
+    async def acquire(self, timeout: float) -> bool:
+        """
+        Wait for a free slot in the window.
+
+        :return: Whether it was freed in time. If not, the acknowledgements
+          are considered lost (i.e. with the connection) and the window is
+          emptied.
+        """
+        return await self._wait(self._free, timeout)
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Wait for all tracked messages to be acknowledged.
+
+        :return: Whether everything was acknowledged in time.
+        """
+        return await self._wait(self._done, timeout)
+
+    async def _wait(self, event: asyncio.Event, timeout: float) -> bool:
+        # Most of the time, without the overhead of the timeout.
+        if event.is_set():
+            return True
+
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except TimeoutError:
+            self._pending.clear()
+            self._free.set()
+            self._done.set()
+            return False
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+__all__ = [
+    "MqttInflightWindow",
+]
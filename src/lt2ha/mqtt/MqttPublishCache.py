@@ -0,0 +1,47 @@
+from time import monotonic
+from typing import Any
+
+
+class MqttPublishCache:
+    """
+    Remembers the last payload published to each topic so the unchanged
+    values are not published again.
+    """
+
+    def __init__(self, max_age: float = 0) -> None:
+        self._max_age = max_age
+        """
+        The time (in seconds) after which the unchanged payload is published
+        anyway. Zero means never.
+        """
+
+        self._published: dict[str, tuple[Any, float]] = {}
+
+    def changed(self, topic: str, payload: Any) -> bool:
+        """
+        Check whether the `payload` should be published and remember it if so.
+        """
+        now = monotonic()
+        last = self._published.get(topic)
+
+        if (
+            last is not None
+            and last[0] == payload
+            and (self._max_age <= 0 or now - last[1] < self._max_age)
+        ):
+            return False
+
+        self._published[topic] = (payload, now)
+
+        return True
+
+    def forget(self, topic: str) -> None:
+        self._published.pop(topic, None)
+
+    def clear(self) -> None:
+        self._published.clear()
+
+
+__all__ = [
+    "MqttPublishCache",
+]
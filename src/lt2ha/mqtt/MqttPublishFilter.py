@@ -0,0 +1,165 @@
+import asyncio
+from collections import deque
+from time import monotonic
+from typing import Any, Callable
+
+from ..LarnitechStateFilter import LarnitechStateFilter
+
+
+# Of the float arithmetic, when comparing to the deadband.
+_TOLERANCE = 1e-9
+
+
+class _Track:
+    __slots__ = ("rule", "value", "published", "published_at", "samples", "deferred", "heartbeat")
+
+    def __init__(self, rule: LarnitechStateFilter) -> None:
+        self.rule = rule
+        # The latest value offered, averaged if needed.
+        self.value: Any = None
+        self.published: float | None = None
+        self.published_at = 0.0
+        self.samples: deque[tuple[float, float]] = deque()
+        self.deferred: asyncio.TimerHandle | None = None
+        self.heartbeat: asyncio.TimerHandle | None = None
+
+    def cancel(self) -> None:
+        for timer in (self.deferred, self.heartbeat):
+            if timer:
+                timer.cancel()
+
+        self.deferred = self.heartbeat = None
+
+
+class MqttPublishFilter:
+    """
+    Thins out the numeric states per topic by the `LarnitechStateFilter`
+    rules, to not flood the broker and the HA recorder with the sensors'
+    jitter. The values that pass are handed to `publish` (possibly later, on
+    the running loop); the non-numeric ones pass right away.
+    """
+
+    def __init__(self, publish: Callable[[str, Any, bool], None]) -> None:
+        self._publish = publish
+        """
+        Publishes the value to the topic; the last argument tells to publish
+        even if unchanged, for the heartbeat.
+        """
+
+        self._tracks: dict[str, _Track] = {}
+
+    def offer(self, topic: str, value: Any, rule: LarnitechStateFilter) -> bool:
+        """
+        Pass the value through the filter.
+
+        :return: Whether it's published right away.
+        """
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            self._publish(topic, value, False)
+            return True
+
+        now = monotonic()
+        track = self._tracks.get(topic)
+
+        if track is None or track.rule != rule:
+            if track:
+                track.cancel()
+
+            track = self._tracks[topic] = _Track(rule)
+
+        if rule.window > 0:
+            track.samples.append((now, number))
+
+            while track.samples[0][0] < now - rule.window:
+                track.samples.popleft()
+
+            number = sum(sample for _, sample in track.samples) / len(track.samples)
+            value = round(number, 2)
+
+        track.value = value
+
+        if not self._significant(track, number):
+            return False
+
+        if now - track.published_at < rule.min_interval:
+            if track.deferred is None:
+                track.deferred = asyncio.get_running_loop().call_later(
+                    track.published_at + rule.min_interval - now,
+                    self._on_deferred,
+                    topic,
+                )
+
+            return False
+
+        self._send(topic, track, False)
+
+        return True
+
+    def forget(self, topic: str) -> None:
+        """
+        Drop the state of the `topic`, so its next value passes.
+        """
+        track = self._tracks.pop(topic, None)
+
+        if track:
+            track.cancel()
+
+    def clear(self) -> None:
+        for track in self._tracks.values():
+            track.cancel()
+
+        self._tracks.clear()
+
+    @staticmethod
+    def _significant(track: _Track, number: float) -> bool:
+        if track.published is None:
+            return True
+
+        threshold = max(track.rule.deadband, track.rule.deadband_relative * abs(track.published))
+
+        if threshold <= 0:
+            return number != track.published
+
+        # E.g. 21.2 - 21.0 is 0.1999999999999993.
+        return abs(number - track.published) >= threshold - _TOLERANCE
+
+    def _on_deferred(self, topic: str) -> None:
+        track = self._tracks[topic]
+        track.deferred = None
+
+        # It may be back within the deadband by now.
+        if self._significant(track, float(track.value)):
+            self._send(topic, track, False)
+
+    def _on_heartbeat(self, topic: str) -> None:
+        track = self._tracks[topic]
+        track.heartbeat = None
+        self._send(topic, track, True)
+
+    def _send(self, topic: str, track: _Track, force: bool) -> None:
+        track.published = float(track.value)
+        track.published_at = monotonic()
+
+        if track.deferred:
+            track.deferred.cancel()
+            track.deferred = None
+
+        if track.heartbeat:
+            track.heartbeat.cancel()
+            track.heartbeat = None
+
+        if track.rule.max_interval > 0:
+            track.heartbeat = asyncio.get_running_loop().call_later(
+                track.rule.max_interval,
+                self._on_heartbeat,
+                topic,
+            )
+
+        self._publish(topic, track.value, force)
+
+
+__all__ = [
+    "MqttPublishFilter",
+]
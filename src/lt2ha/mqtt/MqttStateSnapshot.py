@@ -0,0 +1,126 @@
+import asyncio
+import os
+from json import dumps as json_dumps, loads as json_loads
+from time import time
+from typing import Any, TextIO
+
+
+class MqttStateSnapshot:
+    """
+    The last state published to each topic, kept on disk to be published
+    again right after a restart, before Larnitech is reachable.
+
+    The file is an append-only journal of JSON lines, each being either
+    `[time, topic, payload]` or `[topic]` for a removed topic; the last line
+    for a topic wins. The writes are flushed within a second, a crash loses
+    at most that and the truncated line is skipped on load. Once the journal
+    is mostly superseded lines, it's rewritten and replaced atomically.
+    """
+
+    _FLUSH_INTERVAL = 1
+    _COMPACT_MIN_LINES = 1000
+
+    def __init__(self, path: str | None = None, max_age: float = 0) -> None:
+        self._path = path
+        """
+        The file to keep the snapshot in. Without it, nothing is kept.
+        """
+
+        self._max_age = max_age
+        """
+        The time (in seconds) after which a state is too old to be published
+        on start. Zero means never.
+        """
+
+        self._states: dict[str, tuple[float, Any]] = {}
+        self._file: TextIO | None = None
+        self._lines = 0
+        self._flush: asyncio.TimerHandle | None = None
+
+    def load(self) -> dict[str, Any]:
+        """
+        Read the snapshot and start recording to it.
+
+        :return: The states that are not older than the `max_age`.
+        """
+        if not self._path:
+            return {}
+
+        now = time()
+
+        if os.path.exists(self._path):
+            with open(self._path, encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        entry = json_loads(line)
+                    except ValueError:
+                        # The end of the journal written during a crash.
+                        continue
+
+                    if len(entry) == 1:
+                        self._states.pop(entry[0], None)
+                    elif self._max_age <= 0 or now - entry[0] < self._max_age:
+                        self._states[entry[1]] = (entry[0], entry[2])
+
+        # Start with a journal of the current states only.
+        self._compact()
+
+        return {topic: payload for topic, (_, payload) in self._states.items()}
+
+    def record(self, topic: str, payload: Any) -> None:
+        if self._file is None:
+            return
+
+        now = time()
+        self._states[topic] = (now, payload)
+        self._write((round(now, 3), topic, payload))
+
+    def forget(self, topic: str) -> None:
+        if self._file is None or self._states.pop(topic, None) is None:
+            return
+
+        self._write((topic,))
+
+    def close(self) -> None:
+        if self._flush:
+            self._flush.cancel()
+            self._flush = None
+
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _write(self, entry: tuple) -> None:
+        self._file.write(json_dumps(entry, ensure_ascii=False))
+        self._file.write("\n")
+        self._lines += 1
+
+        if self._lines > max(self._COMPACT_MIN_LINES, 4 * len(self._states)):
+            self._compact()
+        elif self._flush is None:
+            # Batch the writes, this is called for every published state.
+            self._flush = asyncio.get_running_loop().call_later(self._FLUSH_INTERVAL, self._flush_file)
+
+    def _flush_file(self) -> None:
+        self._flush = None
+
+        if self._file:
+            self._file.flush()
+
+    def _compact(self) -> None:
+        self.close()
+
+        # Replace atomically to never leave a half-written file behind.
+        with open(f"{self._path}.tmp", "w", encoding="utf-8") as file:
+            for topic, (updated, payload) in self._states.items():
+                file.write(json_dumps((round(updated, 3), topic, payload), ensure_ascii=False))
+                file.write("\n")
+
+        os.replace(f"{self._path}.tmp", self._path)
+        self._file = open(self._path, "a", encoding="utf-8")
+        self._lines = len(self._states)
+
+
+__all__ = [
+    "MqttStateSnapshot",
+]
@@ -0,0 +1,50 @@
+from typing import Generic, TypeVar
+
+
+_T = TypeVar("_T")
+
+
+class MqttTopicRouter(Generic[_T]):
+    """
+    Maps the subscribed topics to their targets so an incoming message is
+    dispatched with a single lookup, no matter how many topics are there.
+
+    The routes are grouped by an owner (i.e. a device `addr`) to be added
+    and removed together.
+    """
+
+    def __init__(self) -> None:
+        self._routes: dict[str, _T] = {}
+        self._owners: dict[str, tuple[str, ...]] = {}
+
+    def add(self, owner: str, routes: dict[str, _T]) -> None:
+        """
+        Route the `routes` topics, replacing the previous ones of the `owner`.
+        """
+        self.remove(owner)
+        self._routes.update(routes)
+        self._owners[owner] = tuple(routes)
+
+    def remove(self, owner: str) -> tuple[str, ...]:
+        """
+        Stop routing the topics of the `owner`.
+
+        :return: The topics that were routed.
+        """
+        topics = self._owners.pop(owner, ())
+
+        for topic in topics:
+            self._routes.pop(topic, None)
+
+        return topics
+
+    def get(self, topic: str) -> _T | None:
+        return self._routes.get(topic)
+
+    def __len__(self) -> int:
+        return len(self._routes)
+
+
+__all__ = [
+    "MqttTopicRouter",
+]
@@ -1,17 +1,49 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from typing import Literal
 
+from .MqttAckTracker import MqttAckTracker
 from .MqttClient import MqttClient
 from .MqttDiscovery import MqttDiscovery
+from .MqttDiscoveryCache import MqttDiscoveryCache
+from .MqttInflightWindow import MqttInflightWindow
+from .MqttPublishCache import MqttPublishCache
+from .MqttPublishFilter import MqttPublishFilter
+from .MqttStateSnapshot import MqttStateSnapshot
+from .MqttTopicRouter import MqttTopicRouter
+
+
+MqttSubscribeMode = Literal["topic", "batch", "wildcard"]
+"""
+How to subscribe to the command topics: one SUBSCRIBE per topic, a single
+SUBSCRIBE listing all of them, or a single SUBSCRIBE with the wildcards
+that match them all.
+"""
 
 
 @dataclass(frozen=True)
 class Mqtt:
     client: MqttClient
     discovery: MqttDiscovery
+    published: MqttPublishCache = field(default_factory=MqttPublishCache)
+    discovered: MqttDiscoveryCache = field(default_factory=MqttDiscoveryCache)
+    snapshot: MqttStateSnapshot = field(default_factory=MqttStateSnapshot)
+    subscribe_mode: MqttSubscribeMode = "wildcard"
+    state_qos: int = 0
+    """
+    The QoS of the states published to HA.
+    """
 
 
 __all__ = [
     "Mqtt",
+    "MqttAckTracker",
     "MqttClient",
     "MqttDiscovery",
+    "MqttDiscoveryCache",
+    "MqttInflightWindow",
+    "MqttPublishCache",
+    "MqttPublishFilter",
+    "MqttStateSnapshot",
+    "MqttSubscribeMode",
+    "MqttTopicRouter",
 ]